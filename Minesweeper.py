@@ -1,3 +1,23 @@
+import argparse
+from array import array
+import asyncio
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+import cProfile
+import json
+from math import comb
+import mmap
+import os
+import struct
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
 def cria_gerador(b, s):
     '''
     cria_gerador: int x int -> gerador
@@ -66,6 +86,103 @@ def atualiza_estado(g):
         return s
 
 
+def gera_estados(g, k):
+    '''
+    gera_estados: gerador x int -> array
+    Atualiza k vezes o estado do gerador g e devolve os k estados gerados, pela ordem, iguais aos devolvidos por k
+    chamadas sucessivas de atualiza_estado, deixando g no mesmo estado final. O resultado e um array do NumPy de
+    uint32 ou uint64, ou um array.array com os mesmos valores caso o NumPy nao esteja instalado; a excecao e a
+    semente s = 2 ** b, cujos estados nao cabem em b bits, para a qual e sempre uma lista de int. Como os valores
+    do NumPy sao escalares do NumPy, devem ser convertidos com int antes de serem usados.
+    '''
+    b, s = g[0], g[1]
+    if s >> b:
+        # Semente fora do intervalo do tipo (s = 2 ** b): os estados nao cabem num array de b bits
+        return [atualiza_estado(g) for _ in range(k)]
+    estados = array('I' if b == 32 else 'Q', [0]) * k
+
+    if b == 32:
+        for j in range(k):
+            s ^= (s << 13) & 0xFFFFFFFF
+            s ^= s >> 17
+            s ^= (s << 5) & 0xFFFFFFFF
+            estados[j] = s
+    else:
+        for j in range(k):
+            s ^= (s << 13) & 0xFFFFFFFFFFFFFFFF
+            s ^= s >> 7
+            s ^= (s << 17) & 0xFFFFFFFFFFFFFFFF
+            estados[j] = s
+
+    g[1] = s
+    if np is not None:
+        return np.frombuffer(estados, dtype='u' + str(estados.itemsize))
+    return estados
+
+
+# Potencias T^(2^i) da matriz de transicao do xorshift sobre GF(2), para cada numero de bits, calculadas a pedido.
+# Cada matriz e representada pela lista das suas b colunas: a coluna j e a imagem do estado 1 << j.
+POTENCIAS_TRANSICAO = {}
+
+
+# Função Auxiliar
+def aplica_matriz(t, s):
+    '''
+    aplica_matriz: lista x int -> int
+    Devolve a imagem do estado s pela matriz t sobre GF(2), ou seja, o ou-exclusivo das colunas de t
+    correspondentes aos bits de s a 1.
+    '''
+    res = 0
+    j = 0
+    while s:
+        if s & 1:
+            res ^= t[j]
+        s >>= 1
+        j += 1
+    return res
+
+
+# Função Auxiliar
+def obtem_potencia_transicao(b, i):
+    '''
+    obtem_potencia_transicao: int x int -> lista
+    Devolve a matriz T^(2^i), onde T e a transicao de um passo do xorshift de b bits.
+    '''
+    potencias = POTENCIAS_TRANSICAO.setdefault(b, [])
+    if not potencias:
+        potencias.append([atualiza_estado([b, 1 << j]) for j in range(b)])
+    while len(potencias) <= i:
+        t = potencias[-1]
+        potencias.append([aplica_matriz(t, coluna) for coluna in t])
+    return potencias[i]
+
+
+def avanca_estado(g, n):
+    '''
+    avanca_estado: gerador x int -> int
+    Atualiza o estado do gerador g como se atualiza_estado fosse chamado n vezes, e devolve-o.
+    O salto e feito por exponenciacao da matriz de transicao do xorshift sobre GF(2), aplicando ao estado as
+    potencias T^(2^i) correspondentes aos bits de n, em tempo proporcional a log(n) e nao a n. Gera um ValueError
+    com a mensagem 'avanca_estado: argumentos invalidos' caso n nao seja um inteiro nao negativo.
+    '''
+    if not isinstance(n, int) or n < 0:
+        raise ValueError('avanca_estado: argumentos invalidos')
+    b, s = g[0], g[1]
+    if s >> b:
+        # Semente fora do intervalo do tipo (s = 2 ** b): o estado nao cabe nas matrizes de b bits
+        for _ in range(n):
+            atualiza_estado(g)
+        return g[1]
+    i = 0
+    while n:
+        if n & 1:
+            s = aplica_matriz(obtem_potencia_transicao(b, i), s)
+        n >>= 1
+        i += 1
+    g[1] = s
+    return s
+
+
 # -------------------------------------------------- Reconhecedor ----------------------------------------------------#
 
 
@@ -114,6 +231,25 @@ def gera_numero_aleatorio(g, n):
     return (atualiza_estado(g) % n) + 1
 
 
+def divide_gerador(g, k):
+    '''
+    divide_gerador: gerador x int -> lista
+    Devolve uma lista de k geradores independentes obtidos a partir de g, sem o alterar: o gerador i comeca no
+    estado de g avancado i * L passos, com L = (2^b - 1) // k, pelo que cada um pode gerar L numeros sem se
+    sobrepor aos seguintes dentro do periodo 2^b - 1 do xorshift. Gera um ValueError com a mensagem
+    'divide_gerador: argumentos invalidos' caso k nao seja um inteiro positivo.
+    '''
+    if not isinstance(k, int) or k < 1:
+        raise ValueError('divide_gerador: argumentos invalidos')
+    passo = (2 ** g[0] - 1) // k
+    geradores = [cria_copia_gerador(g)]
+    for _ in range(k - 1):
+        seguinte = cria_copia_gerador(geradores[-1])
+        avanca_estado(seguinte, passo)
+        geradores.append(seguinte)
+    return geradores
+
+
 def gera_carater_aleatorio(g, c):
     '''
     gera_carater_aleatorio: gerador x str -> str
@@ -145,7 +281,7 @@ def cria_coordenada(col, lin):
             not 'A' <= col <= 'Z' or not 1 <= lin <= 99 or len(col) != 1:
         raise ValueError('cria_coordenada: argumentos invalidos')
 
-    return (col, lin)
+    return COORDENADAS[(col, lin)]
 
 
 # ---------------------------------------------------- Seletores -----------------------------------------------------#
@@ -229,6 +365,15 @@ def obtem_coordenadas_vizinhas(c):
     Devolve um tuplo com as coordenadas vizinhas à coordenada c, comecando pela coordenada na diagonal 
     acima-esquerda de c e seguindo no sentido horario.
     '''
+    return VIZINHAS_COORDENADA[c]
+
+
+# Função Auxiliar
+def calcula_coordenadas_vizinhas(c):
+    '''
+    calcula_coordenadas_vizinhas: coordenada -> tuplo
+    Calcula o tuplo devolvido por obtem_coordenadas_vizinhas, usado para preencher VIZINHAS_COORDENADA.
+    '''
     col = obtem_coluna(c)
     lin = obtem_linha(c)
     add = [(-1, -1), (0, -1), (1, -1), (1, 0),
@@ -249,6 +394,12 @@ def obtem_coordenadas_vizinhas(c):
     return tuple(res)
 
 
+# Tabela com uma unica instancia de cada coordenada legal e tabela com o tuplo das vizinhas de cada uma, calculadas
+# uma vez para que os caminhos internos nao voltem a validar nem a construir coordenadas.
+COORDENADAS = {(chr(ord('A') + col), lin): (chr(ord('A') + col), lin) for lin in range(1, 100) for col in range(26)}
+VIZINHAS_COORDENADA = {c: calcula_coordenadas_vizinhas(c) for c in COORDENADAS.values()}
+
+
 def obtem_coordenada_aleatoria(c, g):
     '''
     obtem_coordenada_aleatoria: coordenada x gerador -> coordenada
@@ -267,6 +418,15 @@ def obtem_coordenada_aleatoria(c, g):
 #                                                    TAD PARCELA                                                      #
 # -##################################################################################################################-#
 
+# Uma parcela e representada por uma lista [celulas, i] que aponta para a posicao i dos buffers de um conjunto de
+# celulas (ver cria_celulas). As parcelas devolvidas por obtem_parcela partilham os buffers do campo, pelo que os
+# modificadores alteram diretamente o campo. Uma parcela criada com cria_parcela tem buffers proprios de uma celula.
+
+# Estados de uma parcela, guardados nos buffers como o codigo do carater que os representa
+TAPADA = ord('#')
+LIMPA = ord('?')
+MARCADA = ord('@')
+
 # -------------------------------------------------- Construtores ----------------------------------------------------#
 
 
@@ -275,7 +435,7 @@ def cria_parcela():
     cria_parcela: {} -> parcela
     Devolve uma parcela tapada sem mina escondida
     '''
-    return ["#", False]
+    return [cria_celulas(1, 1), 0]
 
 
 def cria_copia_parcela(p):
@@ -284,7 +444,10 @@ def cria_copia_parcela(p):
     Recebe uma parcela p e devolve uma nova copia da parcela.
 
     '''
-    return p.copy()
+    copia = cria_parcela()
+    copia[0]['estados'][0] = p[0]['estados'][p[1]]
+    copia[0]['minas'][0] = p[0]['minas'][p[1]]
+    return copia
 
 
 # -------------------------------------------------- Modificadores ---------------------------------------------------#
@@ -295,8 +458,7 @@ def limpa_parcela(p):
     limpa_parcela: parcela -> parcela
     Modifica destrutivamente a parcela p modificando o seu estado para limpa, e devolve a propria parcela.
     '''
-    p.pop(0)
-    p.insert(0, '?')
+    altera_estado_celula(p[0], p[1], LIMPA)
     return p
 
 
@@ -306,8 +468,7 @@ def marca_parcela(p):
     Modifica destrutivamente a parcela p modificando o seu estado para marcada com uma bandeira, 
     e devolve a propria parcela.
     '''
-    p.pop(0)
-    p.insert(0, '@')
+    altera_estado_celula(p[0], p[1], MARCADA)
     return p
 
 
@@ -316,8 +477,7 @@ def desmarca_parcela(p):
     desmarca_parcela: parcela -> parcela
     Modifica destrutivamente a parcela p modificando o seu estado para tapada, e devolve a propria parcela.
     '''
-    p.pop(0)
-    p.insert(0, '#')
+    altera_estado_celula(p[0], p[1], TAPADA)
     return p
 
 
@@ -326,8 +486,7 @@ def esconde_mina(p):
     esconde_mina: parcela -> parcela
     Modifica destrutivamente a parcela p escondendo uma mina na parcela, e devolve a propria parcela.
     '''
-    p.pop(1)
-    p.insert(1, True)
+    esconde_mina_celula(p[0], p[1])
     return p
 
 
@@ -340,8 +499,9 @@ def eh_parcela(arg):
     Devolve True caso o seu argumento seja um TAD parcela e False caso contrario.
     '''
     return isinstance(arg, list) and len(arg) == 2 and \
-           isinstance(arg[0], str) and isinstance(arg[1], bool) and \
-           len(arg[0]) == 1 and arg[0] in '#?@'
+           isinstance(arg[0], dict) and isinstance(arg[0].get('estados'), bytearray) and \
+           isinstance(arg[1], int) and 0 <= arg[1] < len(arg[0]['estados']) and \
+           arg[0]['estados'][arg[1]] in (TAPADA, LIMPA, MARCADA)
 
 
 def eh_parcela_tapada(p):
@@ -349,7 +509,7 @@ def eh_parcela_tapada(p):
     eh_parcela_tapada: parcela -> booleano
     Devolve True caso a parcela p se encontre tapada e False caso contrario.
     '''
-    return p[0] == '#'
+    return p[0]['estados'][p[1]] == TAPADA
 
 
 def eh_parcela_marcada(p):
@@ -357,7 +517,7 @@ def eh_parcela_marcada(p):
     eh_parcela_marcada: parcela -> booleano
     Devolve True caso a parcela p se encontre marcada com uma bandeira e False caso contrario.
     '''
-    return p[0] == '@'
+    return p[0]['estados'][p[1]] == MARCADA
 
 
 def eh_parcela_limpa(p):
@@ -365,7 +525,7 @@ def eh_parcela_limpa(p):
     eh_parcela_limpa: parcela -> booleano
     Devolve True caso a parcela p se encontre limpa e False caso contrario.
     '''
-    return p[0] == '?'
+    return p[0]['estados'][p[1]] == LIMPA
 
 
 def eh_parcela_minada(p):
@@ -373,7 +533,7 @@ def eh_parcela_minada(p):
     eh_parcela_minada: parcela -> booleano
     Devolve True caso a parcela p esconda uma mina e False caso contrario.
     '''
-    return p[1] == True
+    return p[0]['minas'][p[1]] == 1
 
 
 # ------------------------------------------------------ Teste -------------------------------------------------------#
@@ -385,7 +545,8 @@ def parcelas_iguais(p1, p2):
     Devolve True apenas se p1 e p2 sao parcelas e sao iguais.
     '''
     return eh_parcela(p1) and eh_parcela(p2) and \
-           p1[0] == p2[0] and p1[1] == p2[1]
+           p1[0]['estados'][p1[1]] == p2[0]['estados'][p2[1]] and \
+           p1[0]['minas'][p1[1]] == p2[0]['minas'][p2[1]]
 
 
 # -------------------------------------------------- Transformador ---------------------------------------------------#
@@ -396,11 +557,9 @@ def parcela_para_str(p):
     parcela_para_str : parcela -> str
     Devolve a cadeia de caracteres que representa a parcela em funcao do seu estado.
     '''
-    if p[0] == '?' and p[1] == False:
-        return '?'
-    if p[0] == '?' and p[1] == True:
+    if eh_parcela_limpa(p) and eh_parcela_minada(p):
         return 'X'
-    return p[0]
+    return chr(p[0]['estados'][p[1]])
 
 
 # ---------------------------------------------- Funções de alto nível -----------------------------------------------#
@@ -426,9 +585,68 @@ def alterna_bandeira(p):
 #                                                     TAD CAMPO                                                       #
 # -##################################################################################################################-#
 
+# O campo e representado por um dicionario com as suas dimensoes e buffers planos, indexados pelo numero da
+# celula i = (linha - 1) * colunas + indice da coluna (ordem da esquerda para a direita e de cima para baixo):
+#   'estados'  - bytearray com o estado de cada parcela (TAPADA, LIMPA ou MARCADA);
+#   'minas'    - bytearray com 1 nas parcelas que escondem uma mina e 0 nas restantes;
+#   'vizinhas' - bytearray com o numero de minas vizinhas de cada parcela, atualizado sempre que uma mina e
+#                escondida ou retirada.
+# Os contadores 'n_marcadas', 'n_limpas' e 'n_por_limpar' (parcelas sem mina ainda nao limpas) sao mantidos
+# sempre que um estado muda ou uma mina e escondida ou retirada.
+# O conjunto 'linhas_sujas' guarda as linhas cuja representacao mudou desde a ultima atualizacao do visualizador.
+# O conjunto 'partilhados' guarda os nomes dos buffers que o campo partilha com outros campos depois de um
+# bifurca_campo. Cada buffer partilhado so e copiado (separa_buffers) quando o campo o vai alterar, pelo que todas
+# as alteracoes dos buffers passam por altera_estado_celula, esconde_mina_celula e retira_mina_celula, ou por funcoes
+# que separam primeiro os buffers que alteram.
+# As dimensoes ('colunas', 'linhas', 'ultima_coluna') e as tabelas de indices 'nomes_colunas' (carater de cada
+# coluna) e 'inicio_linhas' (numero da primeira celula de cada linha) sao calculadas uma unica vez na construcao.
+
+# Tabela das colunas possiveis e do indice de cada uma
+ALFABETO = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+INDICE_COLUNA = {col: i for i, col in enumerate(ALFABETO)}
+
 # -------------------------------------------------- Construtores ----------------------------------------------------#
 
 
+# Tabelas partilhadas por todos os campos com as mesmas dimensoes, indexadas por (colunas, linhas)
+TABELAS_CAMPO = {}
+
+
+# Função Auxiliar
+def obtem_tabelas_campo(colunas, linhas):
+    '''
+    obtem_tabelas_campo: int x int -> tuplo
+    Devolve o par (coordenadas, vizinhos) para uma grelha com as dimensoes dadas: o tuplo com a coordenada
+    (interna) de cada celula e o tuplo com o tuplo dos numeros das celulas vizinhas de cada celula, pela ordem de
+    obtem_coordenadas_vizinhas. As tabelas sao calculadas uma unica vez por dimensao.
+    '''
+    if (colunas, linhas) not in TABELAS_CAMPO:
+        coordenadas = tuple(COORDENADAS[(ALFABETO[i % colunas], i // colunas + 1)] for i in range(colunas * linhas))
+        vizinhos = []
+        for i in range(colunas * linhas):
+            col, lin = i % colunas, i // colunas
+            vizinhos.append(tuple(i + y * colunas + x
+                                  for x, y in ((-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0))
+                                  if 0 <= col + x < colunas and 0 <= lin + y < linhas))
+        TABELAS_CAMPO[(colunas, linhas)] = (coordenadas, tuple(vizinhos))
+    return TABELAS_CAMPO[(colunas, linhas)]
+
+
+# Função Auxiliar
+def cria_celulas(colunas, linhas):
+    '''
+    cria_celulas: int x int -> dicionario
+    Devolve os buffers de uma grelha com as dimensoes dadas formada por celulas tapadas e sem minas.
+    '''
+    n = colunas * linhas
+    coordenadas, vizinhos = obtem_tabelas_campo(colunas, linhas)
+    return {'colunas': colunas, 'linhas': linhas, 'ultima_coluna': ALFABETO[colunas - 1],
+            'nomes_colunas': ALFABETO[:colunas], 'inicio_linhas': tuple(range(0, n, colunas)),
+            'coordenadas': coordenadas, 'vizinhos': vizinhos,
+            'estados': bytearray(b'#') * n, 'minas': bytearray(n), 'vizinhas': bytearray(n),
+            'n_marcadas': 0, 'n_limpas': 0, 'n_por_limpar': n, 'linhas_sujas': set(), 'partilhados': set()}
+
+
 def cria_campo(c, l):
     '''
     cria_campo: str x int -> campo
@@ -441,21 +659,7 @@ def cria_campo(c, l):
             not 'A' <= c <= 'Z' or not 1 <= l <= 99 or len(c) != 1:
         raise ValueError('cria_campo: argumentos invalidos')
 
-    campo = {}
-    cols = []
-    lines = []
-    current_col = 'A'
-    current_lin = 1
-    while current_col <= c:
-        cols.append(current_col)
-        current_col = chr(ord(current_col) + 1)
-    while current_lin <= l:
-        lines.append(current_lin)
-        current_lin += 1
-    for lin in lines:
-        for col in cols:
-            campo[(col, lin)] = cria_parcela()
-    return campo
+    return cria_celulas(INDICE_COLUNA[c] + 1, l)
 
 
 def cria_copia_campo(m):
@@ -464,11 +668,29 @@ def cria_copia_campo(m):
     Recebe um campo e devolve uma nova copia do campo.
     '''
     copia_campo = {}
-    for coordenada in m:
-        copia_campo[coordenada] = cria_copia_parcela(m[coordenada])
+    for chave in m:
+        if isinstance(m[chave], (bytearray, set)):
+            copia_campo[chave] = m[chave].copy()
+        else:
+            copia_campo[chave] = m[chave]
+    copia_campo['partilhados'] = set()
     return copia_campo
 
 
+def bifurca_campo(m):
+    '''
+    bifurca_campo: campo -> campo
+    Devolve em tempo constante um novo campo igual a m que partilha com m os buffers das parcelas. Os dois campos
+    passam a ser independentes: cada um copia um buffer partilhado apenas quando o altera pela primeira vez, pelo que
+    a memoria de um ramo cresce apenas com os buffers que altera.
+    '''
+    m['partilhados'].update(('estados', 'minas', 'vizinhas'))
+    ramo = m.copy()
+    ramo['linhas_sujas'] = set()
+    ramo['partilhados'] = set(m['partilhados'])
+    return ramo
+
+
 # ---------------------------------------------------- Seletores -----------------------------------------------------#
 
 
@@ -477,7 +699,7 @@ def obtem_ultima_coluna(m):
     obtem_ultima_coluna: campo -> str
     Devolve a cadeia de caracteres que corresponde à ultima coluna do campo de minas.
     '''
-    return list(m.keys())[-1][0]
+    return m['ultima_coluna']
 
 
 def obtem_ultima_linha(m):
@@ -485,7 +707,35 @@ def obtem_ultima_linha(m):
     obtem_ultima_linha: campo -> int
     Devolve o valor inteiro que corresponde à ultima linha do campo de minas.
     '''
-    return list(m.keys())[-1][1]
+    return m['linhas']
+
+
+# Função Auxiliar
+def obtem_indice(m, c):
+    '''
+    obtem_indice: campo x coordenada -> int
+    Devolve o numero da celula do campo m que se encontra na coordenada c.
+    '''
+    return m['inicio_linhas'][obtem_linha(c) - 1] + INDICE_COLUNA[obtem_coluna(c)]
+
+
+# Função Auxiliar
+def obtem_indices_vizinhos(m, i):
+    '''
+    obtem_indices_vizinhos: campo x int -> tuplo
+    Devolve o tuplo pre-calculado dos numeros das celulas vizinhas da celula i do campo m, pela mesma ordem de
+    obtem_coordenadas_vizinhas.
+    '''
+    return m['vizinhos'][i]
+
+
+# Função Auxiliar
+def obtem_coordenada_indice(m, i):
+    '''
+    obtem_coordenada_indice: campo x int -> coordenada
+    Devolve a coordenada (interna) da celula numero i do campo m.
+    '''
+    return m['coordenadas'][i]
 
 
 def obtem_parcela(m, c):
@@ -493,7 +743,7 @@ def obtem_parcela(m, c):
     obtem_parcela: campo x coordenada -> parcela
     Devolve a parcela do campo m que se encontra na coordenada c.
     '''
-    return m[c]
+    return [m, obtem_indice(m, c)]
 
 
 def obtem_coordenadas(m, s):
@@ -502,35 +752,26 @@ def obtem_coordenadas(m, s):
     Devolve o tuplo formado pelas coordenadas ordenadas em ordem ascendente de esquerda à direita 
     e de cima a baixo das parcelas dependendo do valor de s.
     '''
-    lst = []
     if s == 'limpas':
-        for coordenada in m:
-            if eh_parcela_limpa(obtem_parcela(m, coordenada)):
-                lst.append(coordenada)
-        return tuple(lst)
-
-    if s == 'tapadas':
-        for coordenada in m:
-            if eh_parcela_tapada(obtem_parcela(m, coordenada)):
-                lst.append(coordenada)
-        return tuple(lst)
-
-    if s == 'marcadas':
-        for coordenada in m:
-            if eh_parcela_marcada(obtem_parcela(m, coordenada)):
-                lst.append(coordenada)
-        return tuple(lst)
-
-    if s == 'minadas':
-        for coordenada in m:
-            if eh_parcela_minada(obtem_parcela(m, coordenada)):
-                lst.append(coordenada)
-        return tuple(lst)
-
+        indices = [i for i, e in enumerate(m['estados']) if e == LIMPA]
+    elif s == 'tapadas':
+        indices = [i for i, e in enumerate(m['estados']) if e == TAPADA]
+    elif s == 'marcadas':
+        indices = [i for i, e in enumerate(m['estados']) if e == MARCADA]
+    elif s == 'minadas':
+        indices = [i for i, mina in enumerate(m['minas']) if mina]
     else:
-        for coordenada in m:
-            lst.append(coordenada)
-        return tuple(lst)
+        indices = range(len(m['estados']))
+    return tuple(obtem_coordenada_indice(m, i) for i in indices)
+
+
+def obtem_numero_parcelas(m, s):
+    '''
+    obtem_numero_parcelas: campo x str -> int
+    Devolve, em tempo constante, o numero de parcelas do campo m que estao marcadas (s = 'marcadas'), limpas
+    (s = 'limpas') ou que nao escondem uma mina e ainda nao foram limpas (s = 'por_limpar').
+    '''
+    return m['n_' + s]
 
 
 def obtem_numero_minas_vizinhas(m, c):
@@ -538,12 +779,191 @@ def obtem_numero_minas_vizinhas(m, c):
     obtem_numero_minas_vizinhas: campo x coordenada -> int
     Devolve o numero de parcelas vizinhas da parcela na coordenada c que escondem uma mina.
     '''
-    i = 0
-    for coordenada in obtem_coordenadas_vizinhas(c):
-        if eh_coordenada_do_campo(m, coordenada):
-            if eh_parcela_minada(obtem_parcela(m, coordenada)):
-                i += 1
-    return i
+    return m['vizinhas'][obtem_indice(m, c)]
+
+
+# -------------------------------------------------- Modificadores ---------------------------------------------------#
+
+
+# Função Auxiliar
+def altera_estado_celula(m, i, e):
+    '''
+    altera_estado_celula: campo x int x int -> int
+    Define o estado da celula numero i do campo m como sendo e, atualizando os contadores do campo, e devolve e.
+    '''
+    anterior = m['estados'][i]
+    if anterior == e:
+        return e
+    if m['partilhados']:
+        separa_buffers(m, 'estados')
+    if anterior == MARCADA:
+        m['n_marcadas'] -= 1
+    elif e == MARCADA:
+        m['n_marcadas'] += 1
+    if anterior == LIMPA:
+        m['n_limpas'] -= 1
+        if not m['minas'][i]:
+            m['n_por_limpar'] += 1
+    elif e == LIMPA:
+        m['n_limpas'] += 1
+        if not m['minas'][i]:
+            m['n_por_limpar'] -= 1
+    m['estados'][i] = e
+    m['linhas_sujas'].add(i // m['colunas'])
+    return e
+
+
+# Função Auxiliar
+def suja_linhas_vizinhas(m, i):
+    '''
+    suja_linhas_vizinhas: campo x int -> campo
+    Marca como alteradas a linha da celula numero i do campo m e as linhas adjacentes, cujas contagens de minas
+    vizinhas dependem desta celula, e devolve o campo.
+    '''
+    lin = i // m['colunas']
+    m['linhas_sujas'].update(range(max(lin - 1, 0), min(lin + 2, m['linhas'])))
+    return m
+
+
+# Função Auxiliar
+def separa_buffers(m, *nomes):
+    '''
+    separa_buffers: campo x str x ... -> campo
+    Substitui cada buffer do campo m com um dos nomes dados que esteja partilhado com outro campo por uma copia
+    propria, e devolve o campo. Deve ser chamada antes de alterar um buffer ou de guardar uma referencia para ele
+    que vai ser usada depois de alteracoes.
+    '''
+    partilhados = m['partilhados']
+    for nome in nomes:
+        if nome in partilhados:
+            m[nome] = m[nome].copy()
+            partilhados.discard(nome)
+    return m
+
+
+# Função Auxiliar
+def esconde_mina_celula(m, i):
+    '''
+    esconde_mina_celula: campo x int -> campo
+    Esconde uma mina na celula numero i do campo m, incrementando a contagem de minas das celulas vizinhas,
+    e devolve o campo.
+    '''
+    if not m['minas'][i]:
+        if m['partilhados']:
+            separa_buffers(m, 'minas', 'vizinhas')
+        m['minas'][i] = 1
+        if m['estados'][i] != LIMPA:
+            m['n_por_limpar'] -= 1
+        vizinhas = m['vizinhas']
+        for j in obtem_indices_vizinhos(m, i):
+            vizinhas[j] += 1
+        suja_linhas_vizinhas(m, i)
+    return m
+
+
+# Função Auxiliar
+def retira_mina_celula(m, i):
+    '''
+    retira_mina_celula: campo x int -> campo
+    Retira a mina escondida na celula numero i do campo m, decrementando a contagem de minas das celulas
+    vizinhas, e devolve o campo.
+    '''
+    if m['minas'][i]:
+        if m['partilhados']:
+            separa_buffers(m, 'minas', 'vizinhas')
+        m['minas'][i] = 0
+        if m['estados'][i] != LIMPA:
+            m['n_por_limpar'] += 1
+        vizinhas = m['vizinhas']
+        for j in obtem_indices_vizinhos(m, i):
+            vizinhas[j] -= 1
+        suja_linhas_vizinhas(m, i)
+    return m
+
+
+# Função Auxiliar
+def carrega_minas(m, minas_campo, vizinhas):
+    '''
+    carrega_minas: campo x bytes x bytes -> campo
+    Substitui destrutivamente os buffers de minas e de minas vizinhas do campo m pelos dados, atualizando o
+    contador de parcelas por limpar, e devolve o campo.
+    '''
+    separa_buffers(m, 'minas', 'vizinhas')
+    m['minas'][:] = minas_campo
+    m['vizinhas'][:] = vizinhas
+    return recalcula_contadores(m)
+
+
+# Função Auxiliar
+def recalcula_contadores(m):
+    '''
+    recalcula_contadores: campo -> campo
+    Recalcula a partir dos buffers os contadores de parcelas marcadas, limpas e por limpar do campo m,
+    e devolve o campo.
+    '''
+    estados, minas_campo = m['estados'], m['minas']
+    m['n_marcadas'] = estados.count(MARCADA)
+    m['n_limpas'] = estados.count(LIMPA)
+    m['n_por_limpar'] = sum(1 for i, mina in enumerate(minas_campo) if not mina and estados[i] != LIMPA)
+    m['linhas_sujas'].update(range(m['linhas']))
+    return m
+
+
+# Função Auxiliar
+def reinicia_campo(m):
+    '''
+    reinicia_campo: campo -> campo
+    Repoe destrutivamente todas as parcelas do campo m tapadas e sem minas, reutilizando os seus buffers,
+    e devolve o campo.
+    '''
+    n = len(m['estados'])
+    separa_buffers(m, 'estados', 'minas', 'vizinhas')
+    m['estados'][:] = b'#' * n
+    m['minas'][:] = bytes(n)
+    m['vizinhas'][:] = bytes(n)
+    m['n_marcadas'], m['n_limpas'], m['n_por_limpar'] = 0, 0, n
+    m['linhas_sujas'].update(range(m['linhas']))
+    return m
+
+
+# Função Auxiliar
+def tapa_campo(m):
+    '''
+    tapa_campo: campo -> campo
+    Repoe destrutivamente todas as parcelas do campo m tapadas, mantendo as minas, e devolve o campo.
+    '''
+    separa_buffers(m, 'estados')
+    m['estados'][:] = b'#' * len(m['estados'])
+    return recalcula_contadores(m)
+
+
+# -------------------------------------------------- Empacotamento ---------------------------------------------------#
+
+# Tabelas de conversao entre buffers de 0 e 1 e os digitos binarios correspondentes
+BYTES_PARA_DIGITOS = bytes.maketrans(b'\x00\x01', b'01')
+DIGITOS_PARA_BYTES = bytes.maketrans(b'01', b'\x00\x01')
+
+
+# Função Auxiliar
+def empacota_bits(buffer):
+    '''
+    empacota_bits: bytearray -> bytes
+    Devolve os valores 0 ou 1 do buffer empacotados a 8 por byte, ficando a posicao i no bit i % 8 do byte i // 8.
+    '''
+    n = len(buffer)
+    if n == 0:
+        return b''
+    return int(bytes(buffer).translate(BYTES_PARA_DIGITOS)[::-1], 2).to_bytes((n + 7) // 8, 'little')
+
+
+# Função Auxiliar
+def desempacota_bits(dados, n):
+    '''
+    desempacota_bits: bytes x int -> bytearray
+    Devolve o buffer de n valores 0 ou 1 empacotados em dados por empacota_bits.
+    '''
+    digitos = format(int.from_bytes(dados, 'little'), '0' + str(n) + 'b')[::-1][:n]
+    return bytearray(digitos.encode().translate(DIGITOS_PARA_BYTES))
 
 
 # ------------------------------------------------- Reconhecedores ---------------------------------------------------#
@@ -554,12 +974,15 @@ def eh_campo(arg):
     eh_campo: universal -> booleano
     Devolve True caso o seu argumento seja um TAD campo e False caso contrario.
     '''
-    if not isinstance(arg, dict) or len(arg) == 0:
+    if not isinstance(arg, dict) or not isinstance(arg.get('colunas'), int) or \
+            not isinstance(arg.get('linhas'), int) or \
+            not 1 <= arg['colunas'] <= 26 or not 1 <= arg['linhas'] <= 99:
         return False
-    for coordenada, parcela in arg.items():
-        if not eh_coordenada(coordenada) or not eh_parcela(parcela):
+    n = arg['colunas'] * arg['linhas']
+    for buffer in ('estados', 'minas', 'vizinhas'):
+        if not isinstance(arg.get(buffer), bytearray) or len(arg[buffer]) != n:
             return False
-    return True
+    return not arg['estados'].translate(None, b'#?@') and not arg['minas'].translate(None, b'\x00\x01')
 
 
 def eh_coordenada_do_campo(m, c):
@@ -568,7 +991,8 @@ def eh_coordenada_do_campo(m, c):
     Devolve True se c e uma coordenada valida
     dentro do campo m.
     '''
-    return eh_coordenada(c) and c in m
+    return eh_coordenada(c) and INDICE_COLUNA[obtem_coluna(c)] < m['colunas'] and \
+           obtem_linha(c) <= m['linhas']
 
 
 # ------------------------------------------------------ Teste -------------------------------------------------------#
@@ -579,7 +1003,9 @@ def campos_iguais(m1, m2):
     campos_iguais: campo x campo -> booleano
     Devolve True apenas se m1 e m2 forem campos e forem iguais.
     '''
-    return eh_campo(m1) and eh_campo(m2) and m1 == m2
+    return eh_campo(m1) and eh_campo(m2) and \
+           m1['colunas'] == m2['colunas'] and m1['linhas'] == m2['linhas'] and \
+           m1['estados'] == m2['estados'] and m1['minas'] == m2['minas']
 
 
 
@@ -587,72 +1013,198 @@ def campos_iguais(m1, m2):
 # -------------------------------------------------- Transformador ---------------------------------------------------#
 
 
+# Função Auxiliar
+def linha_para_str(m, lin):
+    '''
+    linha_para_str: campo x int -> str
+    Devolve a cadeia de caracteres que representa a linha de indice lin (a contar de 0) do campo m,
+    incluindo o numero da linha e os limites laterais.
+    '''
+    estados, minas_campo, vizinhas = m['estados'], m['minas'], m['vizinhas']
+    inicio = m['inicio_linhas'][lin]
+    parcelas = []
+    for i in range(inicio, inicio + m['colunas']):
+        if estados[i] != LIMPA:
+            parcelas.append(chr(estados[i]))
+        elif minas_campo[i]:
+            parcelas.append('X')
+        else:
+            parcelas.append(str(vizinhas[i]) if vizinhas[i] != 0 else ' ')
+    return str(lin + 1).zfill(2) + '|' + ''.join(parcelas) + '|'
+
+
+# Função Auxiliar
+def limite_campo_para_str(m):
+    '''
+    limite_campo_para_str: campo -> str
+    Devolve a cadeia de caracteres que representa o limite superior e inferior do campo m.
+    '''
+    return '+' + '-' * m['colunas'] + '+'
+
+
 def campo_para_str(m):
     '''
     campo_para_str : campo -> str
     Devolve uma cadeia de caracteres que representa o campo
     de minas como mostrado nos exemplos.
     '''
-    alfabeto = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
-    grelha = '+---------------------------'
-    n_colunas = ord(obtem_ultima_coluna(m)) - ord("A") + 1
-    s = '   ' + alfabeto[:n_colunas] + '\n  '
-    limite = grelha[:n_colunas + 1] + '+'
-    meio_campo = ''
-    todas_parcelas = ''
-
-    for coordenada in m:
-        parcela = obtem_parcela(m, coordenada)
-        if eh_parcela_limpa(parcela) and not eh_parcela_minada(parcela):
-            if obtem_numero_minas_vizinhas(m, coordenada) == 0:
-                todas_parcelas += ' '
-            else:
-                todas_parcelas += str(obtem_numero_minas_vizinhas(m, coordenada))
-        elif eh_parcela_limpa(parcela) and eh_parcela_minada(parcela):
-            todas_parcelas += 'X'
-        else:
-            todas_parcelas += parcela_para_str(obtem_parcela(m, coordenada))
-    for i in range(obtem_ultima_linha(m)):
-        if i < 9:
-            meio_campo += '0' + str(i + 1) + '|' + todas_parcelas[:n_colunas] + '|\n'
-            todas_parcelas = todas_parcelas[n_colunas:]
-        else:
-            meio_campo += str(i + 1) + '|' + todas_parcelas[:n_colunas] + '|\n'
-            todas_parcelas = todas_parcelas[n_colunas:]
-
-    res = s + limite + '\n' + meio_campo + '  ' + limite
-
+    limite = limite_campo_para_str(m)
+    linhas = ['   ' + m['nomes_colunas'], '  ' + limite]
+    for lin in range(m['linhas']):
+        linhas.append(linha_para_str(m, lin))
+    res = '\n'.join(linhas) + '\n  ' + limite
+    if INSTRUMENTACAO['ativa']:
+        regista_metrica('campo_para_str.bytes', len(res))
     return res
 
 
 # ---------------------------------------------- Funções de alto nível -----------------------------------------------#
 
 
-def coloca_minas(m, c, g, n):
+# Função Auxiliar
+def obtem_indices_excluidos(m, c):
+    '''
+    obtem_indices_excluidos: campo x coordenada -> conjunto
+    Devolve o conjunto dos numeros das celulas onde nao podem ser colocadas minas: a celula na coordenada c
+    e as suas vizinhas.
+    '''
+    i = obtem_indice(m, c)
+    return {i, *obtem_indices_vizinhos(m, i)}
+
+
+def coloca_minas(m, c, g, n, compativel=True):
     '''
-    coloca_minas: campo x coordenada x gerador x int -> campo
+    coloca_minas: campo x coordenada x gerador x int x booleano -> campo
     Modifica destrutivamente o campo m escondendo n minas em parcelas dentro do campo. 
     As n coordenadas sao geradas em sequencia utilizando o gerador g, de modo a que nao coincidam com a coordenada c 
     nem com nenhuma parcela vizinha desta, nem se sobreponham com minas colocadas anteriormente.
+    Se compativel for False, as minas sao antes escolhidas por um baralhamento parcial de Fisher-Yates das celulas
+    elegiveis (ver coloca_minas_baralhadas), em tempo O(n) mas com uma sequencia de sorteios diferente.
     '''
-    coordenadas_minas = [c]
-    while len(coordenadas_minas) < n + 1:
-        nova_c = obtem_coordenada_aleatoria(cria_coordenada(obtem_ultima_coluna(m), obtem_ultima_linha(m)), g)
-        parcela = obtem_parcela(m, nova_c)
-        if nova_c not in coordenadas_minas and not eh_parcela_minada(parcela) and \
-                nova_c not in obtem_coordenadas_vizinhas(c):  # VER IDENTACAO DISSO
-            esconde_mina(parcela)
-            coordenadas_minas.append(nova_c)
+    inicio = time.perf_counter() if INSTRUMENTACAO['ativa'] else None
+    if compativel:
+        coloca_minas_compativel(m, c, g, n)
+    else:
+        coloca_minas_baralhadas(m, c, g, n)
+    if inicio is not None:
+        regista_metrica('coloca_minas.tempo', time.perf_counter() - inicio)
+        regista_metrica('coloca_minas.minas', n)
+    return m
+
+
+def coloca_minas_compativel(m, c, g, n):
+    '''
+    coloca_minas_compativel: campo x coordenada x gerador x int -> campo
+    Modifica destrutivamente o campo m escondendo n minas com a sequencia de sorteios original de coloca_minas:
+    cada candidata e uma coordenada aleatoria (coluna e depois linha) rejeitada se coincidir com c, com uma
+    vizinha de c ou com uma mina ja colocada.
+    '''
+    colunas, linhas = m['colunas'], m['linhas']
+    excluidos = obtem_indices_excluidos(m, c)
+    minas_campo = separa_buffers(m, 'minas', 'vizinhas')['minas']
+    colocadas = 0
+    while colocadas < n:
+        # Cada candidata consome dois estados, como obtem_coordenada_aleatoria: a coluna e depois a linha
+        sorteios = [int(s) for s in gera_estados(g, 2 * (n - colocadas))]
+        for k in range(0, len(sorteios), 2):
+            i = (sorteios[k + 1] % linhas) * colunas + sorteios[k] % colunas
+            if i not in excluidos and not minas_campo[i]:
+                esconde_mina_celula(m, i)
+                colocadas += 1
+                if colocadas == n:
+                    # Repoe o gerador no ultimo estado efetivamente usado, descartando os sorteios em excesso
+                    define_estado(g, sorteios[k + 1])
+                    break
+    return m
+
+
+def coloca_minas_baralhadas(m, c, g, n):
+    '''
+    coloca_minas_baralhadas: campo x coordenada x gerador x int -> campo
+    Modifica destrutivamente o campo m, sem minas, escondendo n minas em celulas que nao coincidem com a coordenada
+    c nem com nenhuma vizinha desta. As celulas sao escolhidas com um baralhamento parcial de Fisher-Yates das
+    celulas elegiveis guiado pelo gerador g. O vetor de celulas elegiveis e virtual: apenas as posicoes trocadas sao
+    guardadas num dicionario, pelo que o tempo e a memoria sao O(n) independentemente do tamanho do campo.
+    Gera um ValueError com a mensagem 'coloca_minas_baralhadas: argumentos invalidos' caso n seja negativo ou
+    maior do que o numero de celulas elegiveis.
+    '''
+    excluidos = sorted(obtem_indices_excluidos(m, c))
+    n_elegiveis = len(m['estados']) - len(excluidos)
+    if not 0 <= n <= n_elegiveis:
+        raise ValueError('coloca_minas_baralhadas: argumentos invalidos')
+    trocas = {}
+    sorteios = [int(s) for s in gera_estados(g, n)]
+    for k in range(n):
+        j = k + sorteios[k] % (n_elegiveis - k)
+        trocas[k], trocas[j] = trocas.get(j, j), trocas.get(k, k)
+        # Converte a posicao entre as celulas elegiveis no numero da celula, saltando as excluidas
+        i = trocas[k]
+        for e in excluidos:
+            if e <= i:
+                i += 1
+        esconde_mina_celula(m, i)
     return m
 
 
-# n = {('A', 1): ['?', True], ('B', 1): ['@', True], ('C', 1): ['#', True], ('A', 2): ['?', False], ('B', 2): ['#', False], ('C', 2): ['#', False], ('A', 3): ['#', False], ('B', 3): ['#', False], ('C', 3): ['#', True]}
-# print(n)
-# print(campo_para_str(n))
+# Função Auxiliar
+def limpa_celulas(m, i):
+    '''
+    limpa_celulas: campo x int -> lista
+    Limpa a celula numero i do campo m e, se esta nao tiver minas vizinhas, propaga a limpeza pelas celulas tapadas
+    em largura, camada a camada (sem recursao), visitando cada celula no maximo uma vez.
+    Devolve a lista dos numeros das celulas que passaram a estar limpas.
+    '''
+    return propaga_limpeza(m, (i,))
+
+
+# Função Auxiliar
+def propaga_limpeza(m, inicios):
+    '''
+    propaga_limpeza: campo x tuplo -> lista
+    Limpa as celulas com os numeros em inicios e propaga a limpeza, como limpa_celulas, a partir de todas as que
+    nao tiverem minas vizinhas numa unica travessia em largura, pelo que as cascatas que se tocam so visitam cada
+    celula uma vez. Devolve a lista dos numeros das celulas que passaram a estar limpas.
+    '''
+    inicio = time.perf_counter() if INSTRUMENTACAO['ativa'] else None
+    separa_buffers(m, 'estados')
+    estados, vizinhas, minas_campo = m['estados'], m['vizinhas'], m['minas']
+    reveladas = []
+    profundidade = 0
+    camada = []
+    for i in inicios:
+        if estados[i] != LIMPA:
+            altera_estado_celula(m, i, LIMPA)
+            reveladas.append(i)
+        if vizinhas[i] == 0 and not minas_campo[i]:
+            camada.append(i)
+    if camada:
+        while camada:
+            seguinte = []
+            for k in camada:
+                for j in obtem_indices_vizinhos(m, k):
+                    if estados[j] == TAPADA:
+                        altera_estado_celula(m, j, LIMPA)
+                        reveladas.append(j)
+                        if vizinhas[j] == 0:
+                            seguinte.append(j)
+            if seguinte:
+                profundidade += 1
+            camada = seguinte
+    if inicio is not None:
+        regista_metrica('limpa_campo.tempo', time.perf_counter() - inicio)
+        regista_metrica('limpa_campo.celulas', len(reveladas))
+        regista_metrica('limpa_campo.profundidade', profundidade)
+    return reveladas
+
+
+def limpa_campo_reveladas(m, c):
+    '''
+    limpa_campo_reveladas: campo x coordenada -> conjunto
+    Modifica destrutivamente o campo como limpa_campo, e devolve o conjunto das coordenadas das parcelas que
+    passaram a estar limpas.
+    '''
+    return {obtem_coordenada_indice(m, i) for i in limpa_celulas(m, obtem_indice(m, c))}
 
-# MUITO IMPORTANTE, CRIA CAMPO FAZER PARA FICAR A1 B1 C1, A2, B2, C2
-# VER SE É BENEFICO ISSO
-# SE SIM, FAZER sorted(m.items(), key=lambda x:x[0][1]
 
 def limpa_campo(m, c):
     '''
@@ -661,146 +1213,2634 @@ def limpa_campo(m, c):
     Se nao houver nenhuma mina vizinha escondida, limpa iterativamente todas as parcelas vizinhas tapadas.
     Caso a parcela se encontre ja limpa, a operacao nao tem efeito.
     '''
-    parcela = obtem_parcela(m, c)
-    if obtem_numero_minas_vizinhas(m, c) != 0:
-        if eh_parcela_tapada(parcela) or eh_parcela_marcada(parcela):
-            limpa_parcela(parcela)
-    if obtem_numero_minas_vizinhas(m, c) == 0:
-        limpa_parcela(parcela)
-        if not eh_parcela_minada(parcela):
-            for coordenada in obtem_coordenadas_vizinhas(c):
-                if eh_coordenada_do_campo(m, coordenada) and eh_parcela_tapada(obtem_parcela(m, coordenada)):
-                    limpa_campo(m, coordenada)
+    limpa_celulas(m, obtem_indice(m, c))
     return m
 
 
+# Função Auxiliar
+def limpa_acorde_celulas(m, i):
+    '''
+    limpa_acorde_celulas: campo x int -> lista
+    Se a celula numero i do campo m estiver limpa, sem mina, e tiver tantas vizinhas marcadas como minas vizinhas,
+    limpa de uma so vez todas as suas vizinhas tapadas, juntando as cascatas numa unica travessia (propaga_limpeza).
+    Devolve a lista dos numeros das celulas que passaram a estar limpas, vazia caso a jogada nao se aplique.
+    '''
+    estados = m['estados']
+    if estados[i] != LIMPA or m['minas'][i] or m['vizinhas'][i] == 0:
+        return []
+    vizinhos = obtem_indices_vizinhos(m, i)
+    if sum(1 for j in vizinhos if estados[j] == MARCADA) != m['vizinhas'][i]:
+        return []
+    tapadas = tuple(j for j in vizinhos if estados[j] == TAPADA)
+    if not tapadas:
+        return []
+    return propaga_limpeza(m, tapadas)
+
+
+def limpa_acorde(m, c):
+    '''
+    limpa_acorde: campo x coordenada -> conjunto
+    Modifica destrutivamente o campo m limpando de uma so vez as vizinhas tapadas da parcela limpa na coordenada c,
+    caso o seu numero de vizinhas marcadas seja igual ao seu numero de minas vizinhas, e devolve o conjunto das
+    coordenadas das parcelas que passaram a estar limpas (vazio caso a jogada nao se aplique).
+    '''
+    return {obtem_coordenada_indice(m, i) for i in limpa_acorde_celulas(m, obtem_indice(m, c))}
+
 
 
 # -##################################################################################################################-#
-#                                                  FUNCOES ADICIONAIS                                                 #
+#                                                   TAD CAMPO EXTENSO                                                 #
 # -##################################################################################################################-#
 
-# --------------------------------------------------- Jogo_ganho -----------------------------------------------------#
+# O campo extenso suporta tabuleiros maiores do que 26 x 99, ou mesmo sem limites. As colunas sao nomeadas por
+# sequencias de letras (A, ..., Z, AA, AB, ...) e as linhas por inteiros positivos, e uma coordenada extensa e o tuplo
+# (coluna, linha). Internamente cada parcela e identificada pela posicao (x, y), a contar de 0.
+# O campo e dividido em blocos de TAMANHO_BLOCO x TAMANHO_BLOCO parcelas, guardados num dicionario indexado por
+# (x // TAMANHO_BLOCO, y // TAMANHO_BLOCO) e criados apenas quando uma das suas parcelas e alterada, pelo que a
+# memoria usada cresce com a area jogada e nao com a area do campo. Cada bloco guarda o bytearray dos estados
+# e, a partir da primeira limpeza, o bytearray do numero de minas vizinhas.
+# As minas de cada bloco sao geradas a pedido com um gerador proprio, cuja seed deriva da seed do campo e da posicao
+# do bloco, sendo cada parcela uma mina com probabilidade densidade. Nao ha minas na primeira parcela limpa nem
+# nas suas vizinhas. As limpezas em cascata podem ser limitadas a um numero de parcelas por chamada, ficando as
+# parcelas por propagar em 'pendentes' ate serem continuadas.
 
+TAMANHO_BLOCO = 16
 
-def jogo_ganho(m):
 
-    for coordenada in obtem_coordenadas(m, ''):
-        parcela = obtem_parcela(m, coordenada)
-        if not eh_parcela_minada(parcela) and not eh_parcela_limpa(parcela):
-            return False
-    return True
+# Função Auxiliar
+def coluna_para_indice(col):
+    '''
+    coluna_para_indice: str -> int
+    Devolve o indice, a contar de 0, da coluna col (A -> 0, Z -> 25, AA -> 26, ...).
+    '''
+    i = 0
+    for letra in col:
+        i = i * 26 + ord(letra) - ord('A') + 1
+    return i - 1
 
 
+# Função Auxiliar
+def indice_para_coluna(i):
+    '''
+    indice_para_coluna: int -> str
+    Devolve a coluna de indice i, a contar de 0 (0 -> A, 25 -> Z, 26 -> AA, ...).
+    '''
+    col = ''
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        col = chr(ord('A') + r) + col
+    return col
 
 
-# -------------------------------------------------- Turno_jogador ---------------------------------------------------#
+def cria_coordenada_extensa(col, lin):
+    '''
+    cria_coordenada_extensa: str x int -> coordenada extensa
+    Recebe uma coluna formada por uma ou mais letras maiusculas e uma linha positiva, e devolve a coordenada extensa
+    correspondente. Gera um ValueError com a mensagem 'cria_coordenada_extensa: argumentos invalidos' caso os seus
+    argumentos nao sejam validos.
+    '''
+    if not eh_coordenada_extensa((col, lin)):
+        raise ValueError('cria_coordenada_extensa: argumentos invalidos')
+    return (col, lin)
 
 
+def eh_coordenada_extensa(arg):
+    '''
+    eh_coordenada_extensa: universal -> booleano
+    Devolve True caso o seu argumento seja uma coordenada extensa e False caso contrario. Toda a coordenada e
+    tambem uma coordenada extensa.
+    '''
+    return isinstance(arg, tuple) and len(arg) == 2 and isinstance(arg[0], str) and isinstance(arg[1], int) and \
+        arg[0].isascii() and arg[0].isalpha() and arg[0].isupper() and arg[1] >= 1
 
-# 2.2.2
-# Função Auxiliar
-def valida_coordenada(arg):
+
+def valida_coordenada_extensa(arg):
     '''
-    valida_coordenada: string → booleano
-    A função devolve True caso a string corresponder a uma
-    coordenada em forma de string.
+    valida_coordenada_extensa: str -> booleano
+    Devolve True caso a cadeia de caracteres arg represente uma coordenada extensa: uma ou mais letras maiusculas
+    seguidas de pelo menos dois digitos, com a linha positiva.
     '''
-    return len(arg) == 3 and isinstance(arg[0], str) and arg[1:].isnumeric()
+    if not isinstance(arg, str):
+        return False
+    k = len(arg) - len(arg.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    digitos = arg[k:]
+    return k > 0 and len(digitos) >= 2 and digitos.isascii() and digitos.isdigit() and int(digitos) >= 1
 
 
-def turno_jogador(m):
+def str_para_coordenada_extensa(s):
     '''
-    turno jogador: campo → booleano:
-    Recebe um campo de minas e oferece ao jogador a opção de escolher
-    uma ação e uma coordenada.
-    Devolve False caso o jogador tenha limpo uma parcela que continha
-    um mina, ou True caso contrário.
+    str_para_coordenada_extensa: str -> coordenada extensa
+    Devolve a coordenada extensa representada por s. A transformacao inversa e feita por coordenada_para_str.
     '''
+    k = len(s) - len(s.lstrip('ABCDEFGHIJKLMNOPQRSTUVWXYZ'))
+    return (s[:k], int(s[k:]))
 
-    while True:
-        acao = input('Escolha uma ação, [L]impar ou [M]arcar:')
-        if acao == 'M':
-            while True:
-                coord_str = input('Escolha uma coordenada:')
-                if valida_coordenada(coord_str):
-                    coordenada = str_para_coordenada(coord_str)
-                    if eh_coordenada_do_campo(m, coordenada) and \
-                            coordenada not in obtem_coordenadas(m, 'limpas'):
-                        alterna_bandeira(obtem_parcela(m, coordenada))
-                        break
-            break
-        if acao == 'L':
-            while True:
-                coord_str = input('Escolha uma coordenada:')
-                if valida_coordenada(coord_str):
-                    coordenada = str_para_coordenada(coord_str)
-                    if eh_coordenada_do_campo(m, coordenada) and \
-                            not coordenada in obtem_coordenadas(m, 'limpas'):
-                        if eh_parcela_minada(obtem_parcela(m, coordenada)):
-                            limpa_campo(m, coordenada)
-                            return False
-                        else:
-                            limpa_campo(m, coordenada)
-                            return True
 
+# --------------------------------------------------- Construtor -----------------------------------------------------#
 
 
+def cria_campo_extenso(densidade, d, s, colunas=None, linhas=None):
+    '''
+    cria_campo_extenso: float x int x int x int x int -> campo extenso
+    Devolve um campo extenso todo tapado com o numero de colunas e de linhas dado, ou sem limite nas dimensoes que
+    forem None, em que cada parcela esconde uma mina com probabilidade densidade, sendo as minas geradas a partir
+    de um gerador de d bits com seed s. Gera um ValueError com a mensagem 'cria_campo_extenso: argumentos invalidos'
+    caso os seus argumentos nao sejam validos.
+    '''
+    if not isinstance(densidade, (int, float)) or not 0 < densidade < 1 or \
+            any(dim is not None and (not isinstance(dim, int) or dim < 1) for dim in (colunas, linhas)):
+        raise ValueError('cria_campo_extenso: argumentos invalidos')
+    try:
+        cria_gerador(d, s)
+    except ValueError:
+        raise ValueError('cria_campo_extenso: argumentos invalidos') from None
+    return {'colunas': colunas, 'linhas': linhas, 'densidade': densidade, 'bits': d, 'seed': s,
+            'limiar': int(densidade * 2 ** d), 'zona_segura': None, 'blocos': {}, 'minas_blocos': {},
+            'pendentes': deque(), 'n_limpas': 0, 'n_marcadas': 0}
 
 
-# ------------------------------------------------------ Minas -------------------------------------------------------#
+# ---------------------------------------------------- Seletores -----------------------------------------------------#
 
 
-def minas(c, l, n, d, s):
+# Função Auxiliar
+def obtem_posicao_extensa(m, c):
     '''
-    minas: str × int × int × int × int → booleano
-    Recebe a última coluna c, última linha l, dimensão do gerador
-    de números d, e o estado inicial ou seed s.
-    A função
-
+    obtem_posicao_extensa: campo extenso x coordenada extensa -> tuplo
+    Devolve a posicao (x, y) da parcela na coordenada c, ou None caso c nao seja uma coordenada do campo m.
     '''
-    if not isinstance(c, str) or not isinstance(l, int) or \
-            not 'A' <= c <= 'Z' or not 1 <= l <= 99 or len(c) != 1:
-        raise ValueError('minas: argumentos invalidos')
-    if not isinstance(d, int) or not isinstance(s, int) or \
-            s <= 0 or (d != 32 and d != 64) or \
-            (d == 32 and s > 2 ** 32) or (d == 64 and s > 2 ** 64):
-        raise ValueError('minas: argumentos invalidos')
-    if not isinstance(n, int) or n <= 0:
-        raise ValueError('minas: argumentos invalidos')
-    if not isinstance(n, int) or n <= 0:
-        raise ValueError('minas: argumentos invalidos')
-    max_col = (ord(c) - ord("A") + 1)
-    if max(max_col, l) > 3:
-        if min(max_col, l) == 1 or min(max_col, l) == 2:
-            if n > l * max_col - (3 * min(max_col, l)):
-                raise ValueError('minas: argumentos invalidos')
-        elif n > l * max_col - 9:
-            raise ValueError('minas: argumentos invalidos')
-    else:
-        raise ValueError('minas: argumentos invalidos')
+    if not eh_coordenada_extensa(c):
+        return None
+    x, y = coluna_para_indice(c[0]), c[1] - 1
+    if m['colunas'] is not None and x >= m['colunas'] or m['linhas'] is not None and y >= m['linhas']:
+        return None
+    return (x, y)
 
-    g = cria_gerador(d, s)
+
+# Função Auxiliar
+def valida_posicao_extensa(m, c, funcao):
+    '''
+    valida_posicao_extensa: campo extenso x coordenada extensa x str -> tuplo
+    Devolve a posicao (x, y) da parcela na coordenada c do campo m, como obtem_posicao_extensa, gerando um
+    ValueError com a mensagem funcao + ': argumentos invalidos' caso c nao seja uma coordenada do campo.
+    '''
+    posicao = obtem_posicao_extensa(m, c)
+    if posicao is None:
+        raise ValueError(funcao + ': argumentos invalidos')
+    return posicao
+
+
+# Função Auxiliar
+def limite_extenso_valido(m, limite):
+    '''
+    limite_extenso_valido: campo extenso x universal -> booleano
+    Devolve True caso limite seja um inteiro positivo, ou None num campo m limitado nas duas dimensoes (onde
+    qualquer cascata acaba), e False caso contrario.
+    '''
+    if limite is None:
+        return m['colunas'] is not None and m['linhas'] is not None
+    return isinstance(limite, int) and limite > 0
+
+
+# Função Auxiliar
+def obtem_posicoes_vizinhas(m, x, y):
+    '''
+    obtem_posicoes_vizinhas: campo extenso x int x int -> lista
+    Devolve a lista das posicoes vizinhas da posicao (x, y) no campo m, pela ordem de obtem_coordenadas_vizinhas.
+    '''
+    colunas, linhas = m['colunas'], m['linhas']
+    res = []
+    for dx, dy in ((-1, -1), (0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0)):
+        vx, vy = x + dx, y + dy
+        if vx >= 0 and vy >= 0 and (colunas is None or vx < colunas) and (linhas is None or vy < linhas):
+            res.append((vx, vy))
+    return res
+
+
+# Função Auxiliar
+def obtem_minas_bloco(m, chave):
+    '''
+    obtem_minas_bloco: campo extenso x tuplo -> bytearray
+    Devolve o bytearray das minas (0 ou 1) do bloco chave do campo m, gerando-o na primeira vez a partir de um
+    gerador proprio do bloco. As parcelas fora do campo e as da zona segura nunca escondem minas.
+    '''
+    minas = m['minas_blocos'].get(chave)
+    if minas is not None:
+        return minas
+    bx, by = chave
+    d = m['bits']
+    # Mistura a seed do campo com a posicao do bloco (splitmix64) para obter a seed do gerador do bloco
+    z = (m['seed'] + (bx + 1) * 0x9E3779B97F4A7C15 + (by + 1) * 0xC2B2AE3D27D4EB4F) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+    z = (z ^ (z >> 31)) & ((1 << d) - 1)
+    limiar = m['limiar']
+    # Os estados podem ser escalares do NumPy, que o bytearray nao aceita: converte-os para int
+    estados = gera_estados(cria_gerador(d, z or 1), TAMANHO_BLOCO ** 2)
+    minas = bytearray(1 if int(estado) < limiar else 0 for estado in estados)
+    x0, y0 = bx * TAMANHO_BLOCO, by * TAMANHO_BLOCO
+    for x, y in m['zona_segura'] or ():
+        if x // TAMANHO_BLOCO == bx and y // TAMANHO_BLOCO == by:
+            minas[(y - y0) * TAMANHO_BLOCO + x - x0] = 0
+    colunas, linhas = m['colunas'], m['linhas']
+    if colunas is not None and x0 + TAMANHO_BLOCO > colunas or linhas is not None and y0 + TAMANHO_BLOCO > linhas:
+        for k in range(TAMANHO_BLOCO ** 2):
+            y, x = divmod(k, TAMANHO_BLOCO)
+            if colunas is not None and x0 + x >= colunas or linhas is not None and y0 + y >= linhas:
+                minas[k] = 0
+    m['minas_blocos'][chave] = minas
+    return minas
+
+
+# Função Auxiliar
+def eh_mina_posicao(m, x, y):
+    '''
+    eh_mina_posicao: campo extenso x int x int -> booleano
+    Devolve True caso a parcela na posicao (x, y) do campo m esconda uma mina.
+    '''
+    return obtem_minas_bloco(m, (x // TAMANHO_BLOCO, y // TAMANHO_BLOCO))[
+        (y % TAMANHO_BLOCO) * TAMANHO_BLOCO + x % TAMANHO_BLOCO] == 1
+
+
+# Função Auxiliar
+def obtem_vizinhas_bloco(m, chave):
+    '''
+    obtem_vizinhas_bloco: campo extenso x tuplo -> bytearray
+    Devolve o bytearray do numero de minas vizinhas de cada parcela do bloco chave do campo m, calculando-o na
+    primeira vez a partir das minas do bloco e das orlas dos oito blocos a sua volta.
+    '''
+    bloco = obtem_bloco_extenso(m, chave)
+    if bloco['vizinhas'] is None:
+        bx, by = chave
+        t = TAMANHO_BLOCO
+        # Grelha (t + 2) x (t + 2) das minas do bloco com uma orla de uma parcela tirada dos blocos vizinhos;
+        # as posicoes negativas ficam a 0
+        lado = t + 2
+        grelha = bytearray(lado * lado)
+        for dy in (-1, 0, 1):
+            for dx in (-1, 0, 1):
+                if bx + dx < 0 or by + dy < 0:
+                    continue
+                minas = obtem_minas_bloco(m, (bx + dx, by + dy))
+                xs = range(t) if dx == 0 else (range(t - 1, t) if dx < 0 else range(1))
+                ys = range(t) if dy == 0 else (range(t - 1, t) if dy < 0 else range(1))
+                for y in ys:
+                    gy = y + 1 + dy * t
+                    for x in xs:
+                        grelha[gy * lado + x + 1 + dx * t] = minas[y * t + x]
+        vizinhas = bytearray(t * t)
+        for y in range(t):
+            acima, meio, abaixo = y * lado, (y + 1) * lado, (y + 2) * lado
+            for x in range(t):
+                vizinhas[y * t + x] = sum(grelha[acima + x:acima + x + 3]) + grelha[meio + x] + \
+                    grelha[meio + x + 2] + sum(grelha[abaixo + x:abaixo + x + 3])
+        bloco['vizinhas'] = vizinhas
+    return bloco['vizinhas']
+
+
+# Função Auxiliar
+def obtem_bloco_extenso(m, chave):
+    '''
+    obtem_bloco_extenso: campo extenso x tuplo -> dicionario
+    Devolve o bloco chave do campo m, criando-o todo tapado caso ainda nao exista.
+    '''
+    bloco = m['blocos'].get(chave)
+    if bloco is None:
+        bloco = m['blocos'][chave] = {'estados': bytearray(b'#') * TAMANHO_BLOCO ** 2, 'vizinhas': None}
+    return bloco
+
+
+def obtem_estado_extenso(m, c):
+    '''
+    obtem_estado_extenso: campo extenso x coordenada extensa -> str
+    Devolve o estado ('#' tapada, '?' limpa ou '@' marcada) da parcela na coordenada c do campo m. Gera um
+    ValueError com a mensagem 'obtem_estado_extenso: argumentos invalidos' caso c nao seja uma coordenada do campo.
+    '''
+    x, y = valida_posicao_extensa(m, c, 'obtem_estado_extenso')
+    bloco = m['blocos'].get((x // TAMANHO_BLOCO, y // TAMANHO_BLOCO))
+    if bloco is None:
+        return '#'
+    return chr(bloco['estados'][(y % TAMANHO_BLOCO) * TAMANHO_BLOCO + x % TAMANHO_BLOCO])
+
+
+def eh_mina_extensa(m, c):
+    '''
+    eh_mina_extensa: campo extenso x coordenada extensa -> booleano
+    Devolve True caso a parcela na coordenada c do campo m esconda uma mina. So deve ser usada depois da primeira
+    limpeza, que fixa a zona sem minas. Gera um ValueError com a mensagem 'eh_mina_extensa: argumentos invalidos'
+    caso c nao seja uma coordenada do campo.
+    '''
+    return eh_mina_posicao(m, *valida_posicao_extensa(m, c, 'eh_mina_extensa'))
+
+
+def obtem_numero_minas_vizinhas_extenso(m, c):
+    '''
+    obtem_numero_minas_vizinhas_extenso: campo extenso x coordenada extensa -> int
+    Devolve o numero de parcelas vizinhas da parcela na coordenada c do campo m que escondem uma mina. Gera um
+    ValueError com a mensagem 'obtem_numero_minas_vizinhas_extenso: argumentos invalidos' caso c nao seja uma
+    coordenada do campo.
+    '''
+    x, y = valida_posicao_extensa(m, c, 'obtem_numero_minas_vizinhas_extenso')
+    return obtem_vizinhas_bloco(m, (x // TAMANHO_BLOCO, y // TAMANHO_BLOCO))[
+        (y % TAMANHO_BLOCO) * TAMANHO_BLOCO + x % TAMANHO_BLOCO]
+
+
+def obtem_numero_parcelas_extenso(m, s):
+    '''
+    obtem_numero_parcelas_extenso: campo extenso x str -> int
+    Devolve o numero de parcelas do campo m que estao marcadas (s = 'marcadas') ou limpas (s = 'limpas').
+    '''
+    return m['n_' + s]
+
+
+def obtem_numero_blocos(m):
+    '''
+    obtem_numero_blocos: campo extenso -> int
+    Devolve o numero de blocos do campo m guardados em memoria, com estados ou apenas com minas.
+    '''
+    return len(m['blocos'].keys() | m['minas_blocos'].keys())
+
+
+# -------------------------------------------------- Modificadores ---------------------------------------------------#
+
+
+# Função Auxiliar
+def altera_estado_extenso(m, x, y, e):
+    '''
+    altera_estado_extenso: campo extenso x int x int x int -> int
+    Altera para e o estado da parcela na posicao (x, y) do campo m, atualizando os contadores, e devolve e.
+    Todas as alteracoes de estado do campo extenso passam por esta funcao.
+    '''
+    estados = obtem_bloco_extenso(m, (x // TAMANHO_BLOCO, y // TAMANHO_BLOCO))['estados']
+    k = (y % TAMANHO_BLOCO) * TAMANHO_BLOCO + x % TAMANHO_BLOCO
+    anterior = estados[k]
+    if anterior == LIMPA:
+        m['n_limpas'] -= 1
+    elif anterior == MARCADA:
+        m['n_marcadas'] -= 1
+    if e == LIMPA:
+        m['n_limpas'] += 1
+    elif e == MARCADA:
+        m['n_marcadas'] += 1
+    estados[k] = e
+    return e
+
+
+def alterna_bandeira_extensa(m, c):
+    '''
+    alterna_bandeira_extensa: campo extenso x coordenada extensa -> booleano
+    Marca a parcela tapada ou desmarca a parcela marcada na coordenada c do campo m. Devolve True caso o estado da
+    parcela tenha sido alterado e False caso esta estivesse limpa. Gera um ValueError com a mensagem
+    'alterna_bandeira_extensa: argumentos invalidos' caso c nao seja uma coordenada do campo.
+    '''
+    x, y = valida_posicao_extensa(m, c, 'alterna_bandeira_extensa')
+    estados = obtem_bloco_extenso(m, (x // TAMANHO_BLOCO, y // TAMANHO_BLOCO))['estados']
+    e = estados[(y % TAMANHO_BLOCO) * TAMANHO_BLOCO + x % TAMANHO_BLOCO]
+    if e == LIMPA:
+        return False
+    altera_estado_extenso(m, x, y, MARCADA if e == TAPADA else TAPADA)
+    return True
+
+
+# Função Auxiliar
+def propaga_limpeza_extensa(m, reveladas, limite):
+    '''
+    propaga_limpeza_extensa: campo extenso x lista x int -> lista
+    Propaga em largura a limpeza a partir das parcelas em 'pendentes' do campo m, juntando as posicoes limpas a
+    reveladas, ate nao haver mais pendentes ou reveladas atingir limite parcelas (None para nao limitar).
+    Devolve a lista das coordenadas extensas das parcelas reveladas.
+    '''
+    pendentes, blocos = m['pendentes'], m['blocos']
+    while pendentes and (limite is None or len(reveladas) < limite):
+        x, y = pendentes[0]
+        for vx, vy in obtem_posicoes_vizinhas(m, x, y):
+            if limite is not None and len(reveladas) >= limite:
+                break
+            chave = (vx // TAMANHO_BLOCO, vy // TAMANHO_BLOCO)
+            k = (vy % TAMANHO_BLOCO) * TAMANHO_BLOCO + vx % TAMANHO_BLOCO
+            bloco = blocos.get(chave)
+            if bloco is None or bloco['estados'][k] == TAPADA:
+                altera_estado_extenso(m, vx, vy, LIMPA)
+                reveladas.append((vx, vy))
+                if obtem_vizinhas_bloco(m, chave)[k] == 0:
+                    pendentes.append((vx, vy))
+        else:
+            pendentes.popleft()
+    return [(indice_para_coluna(x), y + 1) for x, y in reveladas]
+
+
+def limpa_campo_extenso(m, c, limite=None):
+    '''
+    limpa_campo_extenso: campo extenso x coordenada extensa x int -> lista
+    Limpa a parcela na coordenada c do campo m e, se esta nao tiver minas vizinhas, propaga a limpeza como
+    limpa_campo, revelando no maximo limite parcelas (None para nao limitar). A primeira limpeza fixa a zona sem
+    minas. Devolve a lista das coordenadas extensas das parcelas que passaram a estar limpas; as restantes podem
+    ser reveladas com continua_limpeza_extensa. Num campo sem limite numa das dimensoes a cascata pode nao acabar,
+    pelo que limite tem de ser dado. Gera um ValueError com a mensagem 'limpa_campo_extenso: argumentos invalidos'
+    caso c nao seja uma coordenada do campo ou limite nao seja valido.
+    '''
+    if not limite_extenso_valido(m, limite):
+        raise ValueError('limpa_campo_extenso: argumentos invalidos')
+    x, y = valida_posicao_extensa(m, c, 'limpa_campo_extenso')
+    if m['zona_segura'] is None:
+        m['zona_segura'] = [(x, y)] + obtem_posicoes_vizinhas(m, x, y)
+        m['minas_blocos'].clear()
+        for bloco in m['blocos'].values():
+            bloco['vizinhas'] = None
+    chave = (x // TAMANHO_BLOCO, y // TAMANHO_BLOCO)
+    k = (y % TAMANHO_BLOCO) * TAMANHO_BLOCO + x % TAMANHO_BLOCO
+    reveladas = []
+    if obtem_bloco_extenso(m, chave)['estados'][k] != LIMPA:
+        altera_estado_extenso(m, x, y, LIMPA)
+        reveladas.append((x, y))
+        if obtem_vizinhas_bloco(m, chave)[k] == 0 and not eh_mina_posicao(m, x, y):
+            m['pendentes'].append((x, y))
+    return propaga_limpeza_extensa(m, reveladas, limite)
+
+
+def continua_limpeza_extensa(m, limite=None):
+    '''
+    continua_limpeza_extensa: campo extenso x int -> lista
+    Continua as limpezas em cascata do campo m interrompidas pelo limite, revelando no maximo limite parcelas,
+    e devolve a lista das coordenadas extensas das parcelas que passaram a estar limpas. Como em
+    limpa_campo_extenso, limite so pode ser None num campo limitado nas duas dimensoes, gerando um ValueError com a
+    mensagem 'continua_limpeza_extensa: argumentos invalidos' caso contrario.
+    '''
+    if not limite_extenso_valido(m, limite):
+        raise ValueError('continua_limpeza_extensa: argumentos invalidos')
+    return propaga_limpeza_extensa(m, [], limite)
+
+
+def obtem_numero_pendentes(m):
+    '''
+    obtem_numero_pendentes: campo extenso -> int
+    Devolve o numero de parcelas do campo m cuja limpeza em cascata ainda nao foi propagada.
+    '''
+    return len(m['pendentes'])
+
+
+# -------------------------------------------------- Reconhecedor ----------------------------------------------------#
+
+
+def eh_campo_extenso(arg):
+    '''
+    eh_campo_extenso: universal -> booleano
+    Devolve True caso o seu argumento seja um TAD campo extenso e False caso contrario.
+    '''
+    return isinstance(arg, dict) and isinstance(arg.get('blocos'), dict) and \
+        isinstance(arg.get('minas_blocos'), dict) and isinstance(arg.get('densidade'), (int, float))
+
+
+# -------------------------------------------------- Transformador ---------------------------------------------------#
+
+
+def campo_extenso_para_str(m, canto, largura, altura):
+    '''
+    campo_extenso_para_str: campo extenso x coordenada extensa x int x int -> str
+    Devolve a cadeia de caracteres que representa a janela do campo m com largura colunas e altura linhas cujo
+    canto superior esquerdo e a coordenada canto, cortada pelos limites do campo. O formato e o de campo_para_str,
+    com os nomes das colunas escritos na vertical e os numeros das linhas com os digitos necessarios; uma janela
+    dentro de A01-Z99 e desenhada exatamente como campo_para_str a desenharia. Gera um ValueError com a mensagem
+    'campo_extenso_para_str: argumentos invalidos' caso canto nao seja uma coordenada do campo ou largura e altura
+    nao sejam inteiros positivos.
+    '''
+    if not isinstance(largura, int) or not isinstance(altura, int) or largura < 1 or altura < 1:
+        raise ValueError('campo_extenso_para_str: argumentos invalidos')
+    x0, y0 = valida_posicao_extensa(m, canto, 'campo_extenso_para_str')
+    if m['colunas'] is not None:
+        largura = min(largura, m['colunas'] - x0)
+    if m['linhas'] is not None:
+        altura = min(altura, m['linhas'] - y0)
+    nomes = [indice_para_coluna(x) for x in range(x0, x0 + largura)]
+    altura_nomes = max(map(len, nomes))
+    largura_numeros = max(2, len(str(y0 + altura)))
+    margem = ' ' * largura_numeros
+    limite = margem + '+' + '-' * largura + '+'
+    linhas = [margem + ' ' + ''.join(nome.rjust(altura_nomes)[j] for nome in nomes) for j in range(altura_nomes)]
+    linhas.append(limite)
+    blocos = m['blocos']
+    for y in range(y0, y0 + altura):
+        by, base = y // TAMANHO_BLOCO, (y % TAMANHO_BLOCO) * TAMANHO_BLOCO
+        parcelas = []
+        for x in range(x0, x0 + largura):
+            chave = (x // TAMANHO_BLOCO, by)
+            bloco = blocos.get(chave)
+            e = TAPADA if bloco is None else bloco['estados'][base + x % TAMANHO_BLOCO]
+            if e != LIMPA:
+                parcelas.append(chr(e))
+            elif eh_mina_posicao(m, x, y):
+                parcelas.append('X')
+            else:
+                n = obtem_vizinhas_bloco(m, chave)[base + x % TAMANHO_BLOCO]
+                parcelas.append(str(n) if n != 0 else ' ')
+        linhas.append(str(y + 1).zfill(largura_numeros) + '|' + ''.join(parcelas) + '|')
+    linhas.append(limite)
+    return '\n'.join(linhas)
+
+
+
+# -##################################################################################################################-#
+#                                                    TAD CACHE                                                        #
+# -##################################################################################################################-#
+
+# A cache de campos guarda, para cada jogo ja gerado, a disposicao das minas empacotada em bits, a grelha de minas
+# vizinhas e o estado final do gerador. A chave e o tuplo (colunas, linhas, minas, bits do gerador, seed,
+# coordenada inicial, modo compativel). E representada por um dicionario com um OrderedDict das entradas por ordem
+# de uso (LRU), a capacidade maxima em entradas, a diretoria opcional do nivel em disco e os contadores
+# 'acertos', 'acertos_disco' e 'falhas'.
+
+# --------------------------------------------------- Construtor -----------------------------------------------------#
+
+
+def cria_cache_campos(capacidade=256, diretoria=None):
+    '''
+    cria_cache_campos: int x str -> cache
+    Devolve uma cache de campos vazia que guarda em memoria no maximo capacidade entradas, descartando a usada ha
+    mais tempo, e que, se diretoria nao for None, guarda tambem cada entrada num ficheiro dessa diretoria.
+    '''
+    if not isinstance(capacidade, int) or capacidade < 0:
+        raise ValueError('cria_cache_campos: argumentos invalidos')
+    if diretoria is not None:
+        os.makedirs(diretoria, exist_ok=True)
+    return {'capacidade': capacidade, 'diretoria': diretoria, 'entradas': OrderedDict(),
+            'acertos': 0, 'acertos_disco': 0, 'falhas': 0}
+
+
+# ---------------------------------------------------- Seletores -----------------------------------------------------#
+
+
+def obtem_estatisticas_cache(cache):
+    '''
+    obtem_estatisticas_cache: cache -> dicionario
+    Devolve um dicionario com os contadores de acertos em memoria, acertos em disco e falhas da cache, e o numero
+    de entradas em memoria.
+    '''
+    return {'acertos': cache['acertos'], 'acertos_disco': cache['acertos_disco'], 'falhas': cache['falhas'],
+            'entradas': len(cache['entradas'])}
+
+
+# Função Auxiliar
+def obtem_ficheiro_cache(cache, chave):
+    '''
+    obtem_ficheiro_cache: cache x tuplo -> str
+    Devolve o caminho do ficheiro do nivel em disco da cache correspondente a chave.
+    '''
+    colunas, linhas, n, d, s, c, compativel = chave
+    nome = '_'.join((str(colunas), str(linhas), str(n), str(d), str(s), coordenada_para_str(c), str(int(compativel))))
+    return os.path.join(cache['diretoria'], nome + '.campo')
+
+
+# Função Auxiliar
+def le_entrada_disco(cache, chave, n_celulas):
+    '''
+    le_entrada_disco: cache x tuplo x int -> tuplo
+    Devolve a entrada (minas empacotadas, vizinhas, estado final do gerador) guardada no nivel em disco da cache
+    para a chave, de um campo com n_celulas celulas, ou None caso o ficheiro nao exista ou nao tenha o tamanho
+    esperado (por exemplo, se ficou truncado).
+    '''
+    try:
+        with open(obtem_ficheiro_cache(cache, chave), 'rb') as ficheiro:
+            dados = ficheiro.read()
+    except FileNotFoundError:
+        return None
+    n_bytes = (n_celulas + 7) // 8
+    if len(dados) != n_bytes + n_celulas + 9:
+        return None
+    return dados[:n_bytes], dados[n_bytes:n_bytes + n_celulas], int.from_bytes(dados[n_bytes + n_celulas:], 'little')
+
+
+# -------------------------------------------------- Modificadores ---------------------------------------------------#
+
+
+# Função Auxiliar
+def guarda_entrada_cache(cache, chave, entrada):
+    '''
+    guarda_entrada_cache: cache x tuplo x tuplo -> cache
+    Guarda a entrada (minas empacotadas, vizinhas, estado final do gerador) na memoria da cache, descartando as
+    entradas usadas ha mais tempo acima da capacidade, e devolve a cache.
+    '''
+    entradas = cache['entradas']
+    entradas[chave] = entrada
+    entradas.move_to_end(chave)
+    while len(entradas) > cache['capacidade']:
+        entradas.popitem(last=False)
+    return cache
+
+
+def coloca_minas_cache(cache, m, c, g, n, compativel=True):
+    '''
+    coloca_minas_cache: cache x campo x coordenada x gerador x int x booleano -> campo
+    Modifica destrutivamente o campo m e o gerador g exatamente como coloca_minas, consultando primeiro a cache:
+    se o jogo ja tiver sido gerado, copia a disposicao das minas e a grelha de vizinhas guardadas e repoe o estado
+    final do gerador; caso contrario, gera o campo e guarda-o na cache (e no disco, se configurado). Um ficheiro
+    em disco com o tamanho errado conta como falha.
+    '''
+    chave = (m['colunas'], m['linhas'], n, g[0], obtem_estado(g), c, compativel)
+    n_celulas = len(m['estados'])
+    entrada = cache['entradas'].get(chave)
+    if entrada is not None:
+        cache['acertos'] += 1
+        cache['entradas'].move_to_end(chave)
+    elif cache['diretoria'] is not None:
+        entrada = le_entrada_disco(cache, chave, n_celulas)
+        if entrada is not None:
+            cache['acertos_disco'] += 1
+            guarda_entrada_cache(cache, chave, entrada)
+    if entrada is None:
+        cache['falhas'] += 1
+        coloca_minas(m, c, g, n, compativel)
+        entrada = (empacota_bits(m['minas']), bytes(m['vizinhas']), obtem_estado(g))
+        guarda_entrada_cache(cache, chave, entrada)
+        if cache['diretoria'] is not None:
+            # Escreve num ficheiro temporario e substitui-o de uma vez, para nunca deixar um ficheiro a meio
+            ficheiro_cache = obtem_ficheiro_cache(cache, chave)
+            temporario = ficheiro_cache + '.' + str(os.getpid()) + '.tmp'
+            with open(temporario, 'wb') as ficheiro:
+                ficheiro.write(entrada[0] + entrada[1] + entrada[2].to_bytes(9, 'little'))
+            os.replace(temporario, ficheiro_cache)
+        return m
+
+    carrega_minas(m, desempacota_bits(entrada[0], n_celulas), entrada[1])
+    define_estado(g, entrada[2])
+    return m
+
+
+# Cache de campos usada por omissao por minas e joga_partida
+CACHE_CAMPOS = cria_cache_campos()
+
+
+# -##################################################################################################################-#
+#                                                 TAD VISUALIZADOR                                                    #
+# -##################################################################################################################-#
+
+# O visualizador e representado por um dicionario que guarda o campo que desenha, o cabecalho e o rodape e a
+# representacao de cada linha do campo. Em cada atualizacao so sao redesenhadas as linhas que o campo marcou como
+# alteradas em 'linhas_sujas', sendo as restantes reutilizadas. Cada campo deve ter no maximo um visualizador.
+
+# --------------------------------------------------- Construtor -----------------------------------------------------#
+
+
+def cria_visualizador(m):
+    '''
+    cria_visualizador: campo -> visualizador
+    Devolve um visualizador do campo m com todas as linhas desenhadas.
+    '''
+    limite = limite_campo_para_str(m)
+    m['linhas_sujas'].clear()
+    return {'campo': m,
+            'cabecalho': '   ' + m['nomes_colunas'] + '\n  ' + limite + '\n',
+            'rodape': '\n  ' + limite,
+            'linhas': [linha_para_str(m, lin) for lin in range(m['linhas'])]}
+
+
+# -------------------------------------------------- Modificadores ---------------------------------------------------#
+
+
+def atualiza_visualizador(v):
+    '''
+    atualiza_visualizador: visualizador -> lista
+    Redesenha as linhas do campo de v alteradas desde a ultima atualizacao, e devolve a lista ordenada dos
+    indices dessas linhas.
+    '''
+    m = v['campo']
+    alteradas = sorted(m['linhas_sujas'])
+    m['linhas_sujas'].clear()
+    for lin in alteradas:
+        v['linhas'][lin] = linha_para_str(m, lin)
+    return alteradas
+
+
+# -------------------------------------------------- Transformador ---------------------------------------------------#
+
+
+def visualizador_para_str(v):
+    '''
+    visualizador_para_str: visualizador -> str
+    Atualiza o visualizador v e devolve a representacao do seu campo, igual a devolvida por campo_para_str.
+    '''
+    alteradas = atualiza_visualizador(v)
+    res = v['cabecalho'] + '\n'.join(v['linhas']) + v['rodape']
+    if INSTRUMENTACAO['ativa']:
+        regista_metrica('visualizador.linhas', len(alteradas))
+        regista_metrica('visualizador.bytes', len(res))
+    return res
+
+
+def visualizador_para_ansi(v, linha=1):
+    '''
+    visualizador_para_ansi: visualizador x int -> str
+    Atualiza o visualizador v e devolve as sequencias de escape ANSI que, num terminal em que o campo de v foi
+    desenhado como em visualizador_para_str a partir da linha linha (a do cabecalho, a contar de 1), reescrevem
+    apenas os caracteres das parcelas alteradas desde a ultima atualizacao, posicionando o cursor em cada troco.
+    '''
+    antigas = {lin: v['linhas'][lin] for lin in v['campo']['linhas_sujas']}
+    alteradas = atualiza_visualizador(v)
+    partes = []
+    for lin in alteradas:
+        antiga, nova = antigas[lin], v['linhas'][lin]
+        k = 0
+        while k < len(nova):
+            if antiga[k] == nova[k]:
+                k += 1
+                continue
+            inicio = k
+            while k < len(nova) and antiga[k] != nova[k]:
+                k += 1
+            partes.append('\x1b[' + str(linha + 2 + lin) + ';' + str(inicio + 1) + 'H' + nova[inicio:k])
+    res = ''.join(partes)
+    if INSTRUMENTACAO['ativa']:
+        regista_metrica('visualizador.linhas', len(alteradas))
+        regista_metrica('visualizador.bytes', len(res))
+    return res
+
+
+# -##################################################################################################################-#
+#                                                  FUNCOES ADICIONAIS                                                 #
+# -##################################################################################################################-#
+
+# --------------------------------------------------- Jogo_ganho -----------------------------------------------------#
+
+
+def jogo_ganho(m):
+
+    return obtem_numero_parcelas(m, 'por_limpar') == 0
+
+
+
+
+# -------------------------------------------------- Turno_jogador ---------------------------------------------------#
+
+
+
+# 2.2.2
+# Função Auxiliar
+def valida_coordenada(arg):
+    '''
+    valida_coordenada: string → booleano
+    A função devolve True caso a string corresponder a uma
+    coordenada em forma de string.
+    '''
+    return len(arg) == 3 and isinstance(arg[0], str) and arg[1:].isnumeric()
+
+
+# Função Auxiliar
+def aplica_jogada(m, acao, c):
+    '''
+    aplica_jogada: campo x str x coordenada -> booleano
+    Aplica ao campo m a acao ('L' para limpar, 'M' para marcar ou 'A' para limpar em acorde as vizinhas de uma
+    parcela limpa com as minas todas marcadas) na coordenada c, tal como turno_jogador.
+    Devolve False caso tenha sido limpa uma parcela com mina, True caso a jogada tenha sido aplicada sem
+    explosao, e None caso a jogada nao seja valida (coordenada fora do campo, parcela ja limpa, ou, no acorde,
+    parcela cujas vizinhas nao possam ser limpas).
+    '''
+    if acao not in ('L', 'M', 'A') or not eh_coordenada_do_campo(m, c):
+        return None
+    if acao == 'A':
+        reveladas = limpa_acorde_celulas(m, obtem_indice(m, c))
+        if not reveladas:
+            return None
+        minas_campo = m['minas']
+        return not any(minas_campo[i] for i in reveladas)
+    parcela = obtem_parcela(m, c)
+    if eh_parcela_limpa(parcela):
+        return None
+    if acao == 'M':
+        alterna_bandeira(parcela)
+        return True
+    limpa_campo(m, c)
+    return not eh_parcela_minada(parcela)
+
+
+def turno_jogador(m):
+    '''
+    turno jogador: campo → booleano:
+    Recebe um campo de minas e oferece ao jogador a opção de escolher
+    uma ação e uma coordenada.
+    Devolve False caso o jogador tenha limpo uma parcela que continha
+    um mina, ou True caso contrário.
+    Alem de L e M, aceita a acao A (acorde), que limpa numa so jogada as
+    vizinhas tapadas de uma parcela limpa com todas as minas marcadas.
+    '''
+
+    while True:
+        acao = input('Escolha uma ação, [L]impar ou [M]arcar:')
+        if acao == 'M' or acao == 'L' or acao == 'A':
+            while True:
+                coord_str = input('Escolha uma coordenada:')
+                if valida_coordenada(coord_str):
+                    inicio = time.perf_counter() if INSTRUMENTACAO['ativa'] else None
+                    resultado = aplica_jogada(m, acao, str_para_coordenada(coord_str))
+                    if inicio is not None:
+                        regista_metrica('turno_jogador.tempo', time.perf_counter() - inicio)
+                    if resultado is not None:
+                        return resultado
+
+
+
+
+
+# ------------------------------------------------------ Minas -------------------------------------------------------#
+
+
+# Função Auxiliar
+def argumentos_minas_validos(c, l, n, d, s):
+    '''
+    argumentos_minas_validos: universal x universal x universal x universal x universal -> booleano
+    Devolve True caso os argumentos correspondam a um jogo valido: ultima coluna c, ultima linha l,
+    numero de minas n que cabe fora da zona segura da primeira jogada, e gerador de d bits com seed s.
+    '''
+    if not isinstance(c, str) or not isinstance(l, int) or \
+            not 'A' <= c <= 'Z' or not 1 <= l <= 99 or len(c) != 1:
+        return False
+    if not isinstance(d, int) or not isinstance(s, int) or \
+            s <= 0 or (d != 32 and d != 64) or \
+            (d == 32 and s > 2 ** 32) or (d == 64 and s > 2 ** 64):
+        return False
+    if not isinstance(n, int) or n <= 0:
+        return False
+    max_col = (ord(c) - ord("A") + 1)
+    if max(max_col, l) > 3:
+        if min(max_col, l) == 1 or min(max_col, l) == 2:
+            if n > l * max_col - (3 * min(max_col, l)):
+                return False
+        elif n > l * max_col - 9:
+            return False
+    else:
+        return False
+    return True
+
+
+# Sequencia ANSI que limpa o ecra e coloca o cursor no canto superior esquerdo
+ANSI_LIMPA_ECRA = '\x1b[2J\x1b[H'
+
+
+# Função Auxiliar
+def bandeiras_para_str(m, n):
+    '''
+    bandeiras_para_str: campo x int -> str
+    Devolve a linha das bandeiras mostrada por minas para o campo m com n minas.
+    '''
+    return '   [Bandeiras ' + str(obtem_numero_parcelas(m, 'marcadas')) + '/' + str(n) + ']'
+
+
+# Função Auxiliar
+def jogo_para_str(v, bandeiras):
+    '''
+    jogo_para_str: visualizador x str -> str
+    Devolve o texto mostrado por minas em cada turno: a linha das bandeiras e o campo de v.
+    '''
+    return bandeiras + '\n' + visualizador_para_str(v)
+
+
+# Função Auxiliar
+def jogo_para_ansi(v, bandeiras):
+    '''
+    jogo_para_ansi: visualizador x str -> str
+    Devolve as sequencias ANSI que atualizam o ecra desenhado com ANSI_LIMPA_ECRA e jogo_para_str: reescrevem a
+    linha das bandeiras e as parcelas alteradas do campo de v, e deixam o cursor no inicio da linha seguinte ao
+    campo, com o resto do ecra limpo para as perguntas do turno.
+    '''
+    return '\x1b[1;1H' + bandeiras + '\x1b[K' + visualizador_para_ansi(v, 2) + \
+        '\x1b[' + str(v['campo']['linhas'] + 5) + ';1H\x1b[J'
+
+
+# Função Auxiliar
+def mostra_jogo(v, bandeiras, terminal):
+    '''
+    mostra_jogo: visualizador x str x booleano -> {}
+    Mostra a linha das bandeiras e o campo de v: todo o texto de jogo_para_str ou, se terminal for True, so as
+    alteracoes.
+    '''
+    if terminal:
+        print(jogo_para_ansi(v, bandeiras), end='', flush=True)
+    else:
+        print(jogo_para_str(v, bandeiras))
+
+
+def minas(c, l, n, d, s, cache=None, terminal=False):
+    '''
+    minas: str × int × int × int × int → booleano
+    Recebe a última coluna c, última linha l, dimensão do gerador
+    de números d, e o estado inicial ou seed s.
+    A função permite jogar um jogo do minas com n minas, turno a turno, e devolve True se o jogador ganhar
+    ou False se limpar uma parcela com mina.
+    As minas sao obtidas da cache de campos (por omissao, CACHE_CAMPOS) quando o jogo ja foi gerado.
+    Se terminal for True, o campo e desenhado uma vez e depois so sao reescritas, com sequencias ANSI, as parcelas
+    alteradas em cada turno.
+    '''
+    if not argumentos_minas_validos(c, l, n, d, s):
+        raise ValueError('minas: argumentos invalidos')
+    if INSTRUMENTACAO['ativa']:
+        reinicia_instrumentacao()
+
+    g = cria_gerador(d, s)
+    m = cria_campo(c, l)
+    v = cria_visualizador(m)
+    print((ANSI_LIMPA_ECRA if terminal else '') + jogo_para_str(v, bandeiras_para_str(m, n)))
+    c_inicial = str_para_coordenada(input('Escolha uma coordenada:'))
+    coloca_minas_cache(CACHE_CAMPOS if cache is None else cache, m, c_inicial, g, n)
+    limpa_campo(m, c_inicial)
+    while True:
+        bandeiras = bandeiras_para_str(m, n)
+        mostra_jogo(v, bandeiras, terminal)
+        if turno_jogador(m) == False:
+            mostra_jogo(v, bandeiras, terminal)
+            print("BOOOOOOOM!!!")
+            return False
+        if jogo_ganho(m):
+            mostra_jogo(v, bandeiras, terminal)
+            print("VITORIA!!!")
+            return True
+
+
+def minas_lote(c, l, n, d, s, entrada=None, saida=None, tamanho_lote=64, cache=None):
+    '''
+    minas_lote: str x int x int x int x int x ficheiro x ficheiro x int x cache -> booleano
+    Joga minas sem perguntas, lendo as jogadas de entrada (por omissao, sys.stdin), uma por linha na forma 'L A01',
+    'M A01' ou 'A A01'. As linhas e jogadas invalidas sao ignoradas, como em turno_jogador, e ate a primeira
+    limpeza valida, que da a coordenada inicial, as outras jogadas tambem o sao. O texto de jogo_para_str so e
+    escrito em saida (por omissao, sys.stdout) no fim de cada lote de tamanho_lote jogadas e no fim do jogo, com um
+    flush por escrita. Devolve True ou False como minas, ou None se as jogadas acabarem antes do fim do jogo.
+    '''
+    if not argumentos_minas_validos(c, l, n, d, s) or not isinstance(tamanho_lote, int) or tamanho_lote < 1:
+        raise ValueError('minas_lote: argumentos invalidos')
+    if INSTRUMENTACAO['ativa']:
+        reinicia_instrumentacao()
+    entrada = sys.stdin if entrada is None else entrada
+    saida = sys.stdout if saida is None else saida
+
+    g = cria_gerador(d, s)
+    m = cria_campo(c, l)
+    v = cria_visualizador(m)
+    iniciado = False
+    no_lote = 0
+    ganho = None
+    for linha in entrada:
+        partes = linha.split()
+        if len(partes) != 2 or partes[0] not in ('L', 'M', 'A') or not valida_coordenada(partes[1]):
+            continue
+        coordenada = str_para_coordenada(partes[1])
+        if not iniciado:
+            # Como em minas, a primeira jogada e sempre uma limpeza, que define a coordenada inicial
+            if partes[0] != 'L' or not eh_coordenada_do_campo(m, coordenada):
+                continue
+            coloca_minas_cache(CACHE_CAMPOS if cache is None else cache, m, coordenada, g, n)
+            iniciado = True
+        resultado = aplica_jogada(m, partes[0], coordenada)
+        if resultado is None:
+            continue
+        if resultado == False or jogo_ganho(m):
+            ganho = resultado
+            break
+        no_lote += 1
+        if no_lote == tamanho_lote:
+            saida.write(jogo_para_str(v, bandeiras_para_str(m, n)) + '\n')
+            saida.flush()
+            no_lote = 0
+
+    fim = {None: '', False: 'BOOOOOOOM!!!\n', True: 'VITORIA!!!\n'}[ganho]
+    saida.write(jogo_para_str(v, bandeiras_para_str(m, n)) + '\n' + fim)
+    saida.flush()
+    return ganho
+
+
+# -##################################################################################################################-#
+#                                                    RESOLVEDOR                                                       #
+# -##################################################################################################################-#
+
+# Resolvedor por propagacao de restricoes sobre o TAD campo. Cada parcela limpa com numero n impoe que entre as suas
+# vizinhas tapadas e marcadas haja exatamente n minas. As bandeiras existentes sao tratadas como minas certas.
+
+# ------------------------------------------------ Regras de um ponto ------------------------------------------------#
+
+
+# Função Auxiliar
+def eh_celula_restricao(m, i):
+    '''
+    eh_celula_restricao: campo x int -> booleano
+    Devolve True caso a celula numero i do campo m esteja limpa, sem mina e com pelo menos uma mina vizinha,
+    impondo assim uma restricao as suas vizinhas.
+    '''
+    return m['estados'][i] == LIMPA and m['vizinhas'][i] != 0 and not m['minas'][i]
+
+
+# Função Auxiliar
+def enfileira_restricoes(m, fila, celulas):
+    '''
+    enfileira_restricoes: campo x deque x iteravel -> deque
+    Acrescenta a fila de trabalho fila as celulas restricao do campo m que estao entre as celulas dadas ou sao
+    vizinhas de uma delas, ou seja, aquelas cuja vizinhanca mudou quando as celulas dadas mudaram. Devolve a fila.
+    '''
+    for j in celulas:
+        for k in (j,) + obtem_indices_vizinhos(m, j):
+            if eh_celula_restricao(m, k):
+                fila.append(k)
+    return fila
+
+
+def resolve_campo(m, fila=None):
+    '''
+    resolve_campo: campo x deque -> lista
+    Joga destrutivamente no campo m todas as jogadas dedutiveis pelas regras de um ponto: se o numero de uma
+    parcela limpa for igual ao numero de vizinhas marcadas, as vizinhas tapadas sao limpas; se for igual ao numero
+    de vizinhas tapadas e marcadas, as tapadas sao marcadas. As parcelas a analisar sao mantidas numa fila de
+    trabalho, a que so voltam as parcelas cuja vizinhanca mudou. Por omissao a fila comeca com todas as restricoes
+    do campo; se for dada uma fila (ver enfileira_restricoes), so sao analisadas de inicio as parcelas nela, sendo
+    as restantes assumidas ja analisadas sem jogadas, e a fila fica vazia no fim. Devolve a lista das jogadas
+    feitas, pela ordem, como pares ('L', coordenada) (limpa_campo) ou ('M', coordenada) (alterna_bandeira).
+    '''
+    separa_buffers(m, 'estados')
+    estados, vizinhas = m['estados'], m['vizinhas']
+    if fila is None:
+        fila = deque(i for i in range(len(estados)) if eh_celula_restricao(m, i))
+    else:
+        pendentes = [i for i in dict.fromkeys(fila) if eh_celula_restricao(m, i)]
+        fila.clear()
+        fila.extend(pendentes)
+    em_fila = set(fila)
+    jogadas = []
+
+    while fila:
+        i = fila.popleft()
+        em_fila.discard(i)
+        vizinhos = obtem_indices_vizinhos(m, i)
+        tapadas = [j for j in vizinhos if estados[j] == TAPADA]
+        if not tapadas:
+            continue
+        marcadas = sum(1 for j in vizinhos if estados[j] == MARCADA)
+        if vizinhas[i] == marcadas:
+            acao = 'L'
+        elif vizinhas[i] == marcadas + len(tapadas):
+            acao = 'M'
+        else:
+            continue
+
+        alteradas = []
+        for j in tapadas:
+            # Uma jogada anterior desta mesma regra pode ja ter limpo a parcela em cascata
+            if estados[j] != TAPADA:
+                continue
+            jogadas.append((acao, obtem_coordenada_indice(m, j)))
+            if acao == 'L':
+                alteradas.extend(limpa_celulas(m, j))
+            else:
+                altera_estado_celula(m, j, MARCADA)
+                alteradas.append(j)
+
+        for j in alteradas:
+            for k in (j,) + obtem_indices_vizinhos(m, j):
+                if k not in em_fila and eh_celula_restricao(m, k):
+                    fila.append(k)
+                    em_fila.add(k)
+    return jogadas
+
+
+# -------------------------------------------------- Probabilidades --------------------------------------------------#
+
+# A fronteira (parcelas tapadas vizinhas de uma restricao) e dividida em componentes independentes: duas parcelas
+# ficam na mesma componente se partilharem uma restricao. Cada componente e enumerada por programacao dinamica sobre
+# as suas parcelas, em que o estado e o tuplo das necessidades ainda por satisfazer das restricoes abertas; estados
+# iguais sao fundidos, o que memoiza os subproblemas repetidos da pesquisa com retrocesso. As componentes sao depois
+# combinadas pelo numero total de minas, ponderando cada total pelas combinacoes das minas restantes no interior.
+# Como a enumeracao de uma componente so depende das suas celulas e restricoes, os resultados podem ser guardados
+# numa memoria entre chamadas, sendo enumeradas de novo apenas as componentes que mudaram.
+
+
+# Função Auxiliar
+def obtem_restricoes(m):
+    '''
+    obtem_restricoes: campo -> lista
+    Devolve a lista das restricoes do campo m, como pares (minas em falta, lista das celulas vizinhas tapadas),
+    uma por cada parcela limpa com numero que tenha vizinhas tapadas. As vizinhas marcadas contam como minas.
+    '''
+    estados = m['estados']
+    restricoes = []
+    for i in range(len(estados)):
+        if eh_celula_restricao(m, i):
+            vizinhos = obtem_indices_vizinhos(m, i)
+            tapadas = [j for j in vizinhos if estados[j] == TAPADA]
+            if tapadas:
+                marcadas = sum(1 for j in vizinhos if estados[j] == MARCADA)
+                restricoes.append((m['vizinhas'][i] - marcadas, tapadas))
+    return restricoes
+
+
+# Função Auxiliar
+def obtem_componentes(restricoes):
+    '''
+    obtem_componentes: lista -> lista
+    Divide as restricoes em componentes independentes, devolvendo uma lista de pares (celulas, restricoes) em que
+    as celulas de cada componente estao por ordem de descoberta numa pesquisa em largura.
+    '''
+    por_celula = {}
+    for r, (_, celulas) in enumerate(restricoes):
+        for j in celulas:
+            por_celula.setdefault(j, []).append(r)
+
+    componentes = []
+    vistas = set()
+    for inicio in por_celula:
+        if inicio in vistas:
+            continue
+        vistas.add(inicio)
+        celulas, ids = [], set()
+        fila = deque([inicio])
+        while fila:
+            j = fila.popleft()
+            celulas.append(j)
+            for r in por_celula[j]:
+                if r not in ids:
+                    ids.add(r)
+                    for k in restricoes[r][1]:
+                        if k not in vistas:
+                            vistas.add(k)
+                            fila.append(k)
+        componentes.append((celulas, [restricoes[r] for r in sorted(ids)]))
+    return componentes
+
+
+# Função Auxiliar
+def enumera_componente(celulas, restricoes):
+    '''
+    enumera_componente: lista x lista -> tuplo
+    Conta as solucoes de uma componente. Devolve o par (totais, minadas) em que totais[k] e o numero de solucoes
+    com k minas e minadas[p][k] o numero dessas solucoes em que a celula celulas[p] tem mina.
+    '''
+    n_celulas = len(celulas)
+    posicao = {j: p for p, j in enumerate(celulas)}
+    membros = [sorted(posicao[j] for j in vs) for _, vs in restricoes]
+
+    # Para cada celula, as restricoes que a contem e quantas celulas destas ficam depois dela
+    de_celula = [[] for _ in range(n_celulas)]
+    for r, ps in enumerate(membros):
+        for idx, p in enumerate(ps):
+            de_celula[p].append((r, len(ps) - idx - 1))
+    # Restricoes abertas antes de decidir a celula p: comecadas antes de p e que terminam em p ou depois
+    abertas = [tuple(r for r, ps in enumerate(membros) if ps[0] < p <= ps[-1]) for p in range(n_celulas + 1)]
+
+    def transita(p, estado, x):
+        necessidades = dict(zip(abertas[p], estado))
+        for r, restantes in de_celula[p]:
+            v = necessidades.get(r, restricoes[r][0]) - x
+            if v < 0 or v > restantes:
+                return None
+            necessidades[r] = v
+        return tuple(necessidades[r] for r in abertas[p + 1])
+
+    # Passagem para a frente: numero de atribuicoes das celulas anteriores a p por estado e numero de minas
+    frente = [{(): {0: 1}}]
+    for p in range(n_celulas):
+        seguinte = {}
+        for estado, dist in frente[p].items():
+            for x in (0, 1):
+                novo = transita(p, estado, x)
+                if novo is not None:
+                    alvo = seguinte.setdefault(novo, {})
+                    for k, contagem in dist.items():
+                        alvo[k + x] = alvo.get(k + x, 0) + contagem
+        frente.append(seguinte)
+
+    # Passagem para tras: numero de atribuicoes das celulas a partir de p que completam cada estado
+    tras = [None] * n_celulas + [{(): {0: 1}}]
+    for p in range(n_celulas - 1, -1, -1):
+        camada = {}
+        for estado in frente[p]:
+            dist = {}
+            for x in (0, 1):
+                novo = transita(p, estado, x)
+                if novo in tras[p + 1]:
+                    for k, contagem in tras[p + 1][novo].items():
+                        dist[k + x] = dist.get(k + x, 0) + contagem
+            if dist:
+                camada[estado] = dist
+        tras[p] = camada
+
+    minadas = []
+    for p in range(n_celulas):
+        contagens = {}
+        for estado, antes in frente[p].items():
+            depois = tras[p + 1].get(transita(p, estado, 1))
+            if depois is None:
+                continue
+            for a, ca in antes.items():
+                for b, cb in depois.items():
+                    contagens[a + b + 1] = contagens.get(a + b + 1, 0) + ca * cb
+        minadas.append(contagens)
+    return frente[n_celulas].get((), {}), minadas
+
+
+# Função Auxiliar
+def convolui(d1, d2):
+    '''
+    convolui: dicionario x dicionario -> dicionario
+    Devolve a convolucao de duas distribuicoes {numero de minas: numero de configuracoes}.
+    '''
+    res = {}
+    for a, ca in d1.items():
+        for b, cb in d2.items():
+            res[a + b] = res.get(a + b, 0) + ca * cb
+    return res
+
+
+def probabilidades_minas(m, n, memoria=None):
+    '''
+    probabilidades_minas: campo x int x dicionario -> dicionario
+    Devolve um dicionario que associa a cada coordenada de uma parcela tapada do campo m a probabilidade exata de
+    esta esconder uma mina, sabendo os numeros das parcelas limpas e que o campo tem n minas no total.
+    As parcelas marcadas sao consideradas minas. Se for dada uma memoria, as enumeracoes das componentes sao lidas
+    dela e as que faltam sao la guardadas, pelo que chamadas sucessivas so enumeram as componentes novas.
+    Gera um ValueError com a mensagem 'probabilidades_minas: campo inconsistente' caso nenhuma disposicao das minas
+    seja compativel com o campo.
+    '''
+    estados = m['estados']
+    componentes = obtem_componentes(obtem_restricoes(m))
+    fronteira = {j for celulas, _ in componentes for j in celulas}
+    interior = [i for i in range(len(estados)) if estados[i] == TAPADA and i not in fronteira]
+    n_interior = len(interior)
+    restantes = n - obtem_numero_parcelas(m, 'marcadas')
+
+    resultados = []
+    for celulas, restricoes in componentes:
+        if memoria is None:
+            resultados.append(enumera_componente(celulas, restricoes))
+            continue
+        chave = (tuple(celulas), tuple((k, tuple(vs)) for k, vs in restricoes))
+        if chave not in memoria:
+            memoria[chave] = enumera_componente(celulas, restricoes)
+        resultados.append(memoria[chave])
+
+    def peso(k):
+        # Numero de formas de colocar no interior as minas que a fronteira nao usa
+        return comb(n_interior, restantes - k) if 0 <= restantes - k <= n_interior else 0
+
+    # Distribuicao do numero de minas de todas as componentes exceto a c, por prefixos e sufixos
+    prefixos = [{0: 1}]
+    for totais, _ in resultados:
+        prefixos.append(convolui(prefixos[-1], totais))
+    sufixos = [{0: 1}]
+    for totais, _ in reversed(resultados):
+        sufixos.append(convolui(sufixos[-1], totais))
+    sufixos.reverse()
+
+    todas = prefixos[-1]
+    total = sum(contagem * peso(k) for k, contagem in todas.items())
+    if total == 0:
+        raise ValueError('probabilidades_minas: campo inconsistente')
+
+    probabilidades = {}
+    for c, (celulas, _) in enumerate(componentes):
+        outras = convolui(prefixos[c], sufixos[c + 1])
+        pesos = {}
+        for p, contagens in enumerate(resultados[c][1]):
+            soma = 0
+            for k, contagem in contagens.items():
+                if k not in pesos:
+                    pesos[k] = sum(co * peso(k + ko) for ko, co in outras.items())
+                soma += contagem * pesos[k]
+            probabilidades[obtem_coordenada_indice(m, celulas[p])] = soma / total
+
+    if n_interior:
+        soma = sum(contagem * peso(k) * (restantes - k) for k, contagem in todas.items())
+        p_interior = soma / (total * n_interior)
+        for i in interior:
+            probabilidades[obtem_coordenada_indice(m, i)] = p_interior
+    return probabilidades
+
+
+# ------------------------------------------------- Campos sem palpites ----------------------------------------------#
+
+
+# Função Auxiliar
+def avanca_deducao(m, n, fila, memoria):
+    '''
+    avanca_deducao: campo x int x deque x dicionario -> booleano
+    Continua destrutivamente a resolucao por deducao do campo m, com n minas, a partir do estado em que este esta:
+    corre resolve_campo sobre a fila de trabalho fila e, quando esta esvazia, joga as parcelas com probabilidade 0
+    ou 1 de ter mina (com a memoria de componentes memoria), pondo na fila as restricoes vizinhas das parcelas que
+    mudaram. Devolve True se o jogo ficar ganho, ou False, com a fila vazia, quando nao houver jogadas certas.
+    '''
+    while True:
+        resolve_campo(m, fila)
+        if jogo_ganho(m):
+            return True
+        certas = [(p, coordenada) for coordenada, p in probabilidades_minas(m, n, memoria).items()
+                  if p == 0 or p == 1]
+        if not certas:
+            return False
+        for p, coordenada in certas:
+            i = obtem_indice(m, coordenada)
+            if m['estados'][i] == TAPADA:
+                if p == 0:
+                    enfileira_restricoes(m, fila, limpa_celulas(m, i))
+                else:
+                    altera_estado_celula(m, i, MARCADA)
+                    enfileira_restricoes(m, fila, (i,))
+
+
+def resolve_por_deducao(m, c, n):
+    '''
+    resolve_por_deducao: campo x coordenada x int -> booleano
+    Limpa destrutivamente a coordenada c do campo m, com n minas, e continua a jogar apenas jogadas certas:
+    primeiro as regras de um ponto de resolve_campo e, quando estas param, as parcelas com probabilidade 0 ou 1
+    de ter mina. Para logo que nao haja nenhuma jogada certa. Devolve True se o jogo ficar ganho.
+    '''
+    fila = enfileira_restricoes(m, deque(), limpa_celulas(m, obtem_indice(m, c)))
+    return avanca_deducao(m, n, fila, {})
+
+
+# Função Auxiliar
+def redistribui_minas_tapadas(m, g):
+    '''
+    redistribui_minas_tapadas: campo x gerador -> lista
+    Volta a sortear com o gerador g, por um baralhamento parcial de Fisher-Yates, as posicoes das minas escondidas
+    nas parcelas tapadas do campo m, mantendo o seu numero; as parcelas limpas e marcadas nao mudam.
+    Devolve a lista dos numeros das celulas que ganharam ou perderam uma mina.
+    '''
+    estados, minas_campo = m['estados'], m['minas']
+    tapadas = [i for i in range(len(estados)) if estados[i] == TAPADA]
+    antigas = {i for i in tapadas if minas_campo[i]}
+    k = len(antigas)
+    sorteios = [int(s) for s in gera_estados(g, k)]
+    for p in range(k):
+        j = p + sorteios[p] % (len(tapadas) - p)
+        tapadas[p], tapadas[j] = tapadas[j], tapadas[p]
+    novas = set(tapadas[:k])
+    for i in antigas - novas:
+        retira_mina_celula(m, i)
+    for i in novas - antigas:
+        esconde_mina_celula(m, i)
+    return sorted(antigas ^ novas)
+
+
+def coloca_minas_sem_palpites(m, c, g, n, max_candidatos=1000, compativel=False):
+    '''
+    coloca_minas_sem_palpites: campo x coordenada x gerador x int x int x booleano -> dicionario
+    Modifica destrutivamente o campo m escondendo n minas como coloca_minas, e procura com o gerador g, no maximo
+    em max_candidatos disposicoes, uma que se resolva a partir de c apenas por deducao (ver resolve_por_deducao).
+    Quando o resolvedor fica sem jogadas certas, a regiao ja resolvida (parcelas limpas e marcadas) e mantida e so
+    as minas das parcelas tapadas sao sorteadas de novo (redistribui_minas_tapadas), formando a candidata seguinte;
+    a resolucao continua com a mesma fila de trabalho, a que se juntam as restricoes cujo numero mudou, e com a mesma
+    memoria de componentes. Se uma candidata assim formada parar sem resolver mais nenhuma parcela (por exemplo
+    num bolso de parcelas tapadas que nenhum numero toca), a seguinte e sorteada de raiz com coloca_minas.
+    Como as jogadas anteriores foram deduzidas com numeros antigos, uma candidata resolvida a partir de outra so e
+    aceite depois de uma resolucao completa a partir de c, que, se parar, continua como acima.
+    No fim o campo fica tapado com as minas da ultima candidata. Devolve um dicionario com 'sem_palpites' (se a
+    disposicao foi aceite), 'candidatos', 'verificacoes' (resolucoes completas repetidas) e 'tempo'.
+    '''
+    inicio = time.perf_counter()
+    reinicia_campo(m)
+    coloca_minas(m, c, g, n, compativel)
+    i_inicial = obtem_indice(m, c)
+    candidatos, verificacoes = 1, 0
+    memoria = {}
+    fila = enfileira_restricoes(m, deque(), limpa_celulas(m, i_inicial))
+    do_inicio = True
+    resolvidas_antes = None
+    while True:
+        if avanca_deducao(m, n, fila, memoria):
+            if do_inicio:
+                aceite = True
+                break
+            # Verifica a candidata resolvendo-a de novo desde a primeira jogada
+            verificacoes += 1
+            tapa_campo(m)
+            fila = enfileira_restricoes(m, deque(), limpa_celulas(m, i_inicial))
+            do_inicio = True
+            resolvidas_antes = None
+        elif candidatos < max_candidatos:
+            candidatos += 1
+            resolvidas = obtem_numero_parcelas(m, 'limpas') + obtem_numero_parcelas(m, 'marcadas')
+            if resolvidas == resolvidas_antes:
+                reinicia_campo(m)
+                coloca_minas(m, c, g, n, compativel)
+                fila = enfileira_restricoes(m, deque(), limpa_celulas(m, i_inicial))
+                do_inicio = True
+                resolvidas_antes = None
+                continue
+            resolvidas_antes = resolvidas
+            mudadas = redistribui_minas_tapadas(m, g)
+            # Uma parcela limpa que fique sem minas vizinhas abre as suas vizinhas, como no jogo
+            zeros = tuple({k for j in mudadas for k in obtem_indices_vizinhos(m, j)
+                           if m['estados'][k] == LIMPA and m['vizinhas'][k] == 0})
+            enfileira_restricoes(m, fila, mudadas + propaga_limpeza(m, zeros))
+            do_inicio = False
+        else:
+            aceite = False
+            break
+
+    # Volta a tapar o campo mantendo a disposicao da ultima candidata
+    tapa_campo(m)
+    return {'sem_palpites': aceite, 'candidatos': candidatos, 'verificacoes': verificacoes,
+            'tempo': time.perf_counter() - inicio}
+
+
+# -##################################################################################################################-#
+#                                                 GRAVACAO DE JOGOS                                                   #
+# -##################################################################################################################-#
+
+# Formato binario compacto, versao FORMATO_VERSAO, em little-endian:
+#   gerador - 1 byte com o numero de bits b e o estado em b // 8 + 1 bytes;
+#   campo   - 1 byte com o numero de colunas, 1 byte com o numero de linhas, o estado de cada parcela em 2 bits
+#             (0 tapada, 1 limpa, 2 marcada; 4 parcelas por byte, a parcela i nos bits 2 * (i % 4)) e a mascara das
+#             minas em 1 bit por parcela;
+#   jogo    - o gerador seguido do campo.
+# Um arquivo de jogos comeca pelo cabecalho FORMATO_MAGICO + versao, seguido dos jogos, de uma tabela com a posicao
+# de cada jogo (8 bytes por jogo) e de um rodape com o numero de jogos e a posicao da tabela (8 bytes cada).
+# O arquivo e lido com mmap, pelo que abrir um jogo so le os bytes desse jogo.
+
+FORMATO_MAGICO = b'MINA'
+FORMATO_VERSAO = 1
+ESTADO_PARA_CODIGO = {TAPADA: 0, LIMPA: 1, MARCADA: 2}
+# Conversao de um byte com 4 estados de 2 bits nos 4 carateres de estado correspondentes
+BYTE_PARA_ESTADOS = [bytes(b'#?@#'[(byte >> (2 * k)) & 3] for k in range(4)) for byte in range(256)]
+ESTADOS_PARA_DIGITOS = bytes.maketrans(b'#?@', b'012')
+
+# -------------------------------------------------- Serializacao ----------------------------------------------------#
+
+
+def gerador_para_bytes(g):
+    '''
+    gerador_para_bytes: gerador -> bytes
+    Devolve a representacao binaria compacta do gerador g.
+    '''
+    return bytes([g[0]]) + g[1].to_bytes(g[0] // 8 + 1, 'little')
+
+
+def bytes_para_gerador(dados):
+    '''
+    bytes_para_gerador: bytes -> gerador
+    Devolve o gerador representado pelos bytes dados, produzidos por gerador_para_bytes.
+    '''
+    return cria_gerador(dados[0], int.from_bytes(dados[1:dados[0] // 8 + 2], 'little'))
+
+
+# Função Auxiliar
+def empacota_estados(estados):
+    '''
+    empacota_estados: bytearray -> bytes
+    Devolve os estados das parcelas dados empacotados em 2 bits cada, 4 parcelas por byte.
+    '''
+    digitos = bytes(estados).translate(ESTADOS_PARA_DIGITOS)[::-1]
+    return int(digitos, 4).to_bytes((len(estados) + 3) // 4, 'little')
+
+
+# Função Auxiliar
+def desempacota_estados(dados, n):
+    '''
+    desempacota_estados: bytes x int -> bytes
+    Devolve os n estados de parcelas empacotados em dados por empacota_estados.
+    '''
+    return b''.join(BYTE_PARA_ESTADOS[byte] for byte in dados[:(n + 3) // 4])[:n]
+
+
+def campo_para_bytes(m):
+    '''
+    campo_para_bytes: campo -> bytes
+    Devolve a representacao binaria compacta do campo m: dimensoes, estados em 2 bits e mascara das minas.
+    '''
+    return bytes([m['colunas'], m['linhas']]) + empacota_estados(m['estados']) + empacota_bits(m['minas'])
+
+
+def bytes_para_campo(dados):
+    '''
+    bytes_para_campo: bytes -> campo
+    Devolve o campo representado pelos bytes dados, produzidos por campo_para_bytes, recalculando a grelha de
+    minas vizinhas e os contadores.
+    '''
+    m = cria_celulas(dados[0], dados[1])
+    n = len(m['estados'])
+    fim_estados = 2 + (n + 3) // 4
+    m['estados'][:] = desempacota_estados(dados[2:fim_estados], n)
+    for i, mina in enumerate(desempacota_bits(dados[fim_estados:fim_estados + (n + 7) // 8], n)):
+        if mina:
+            esconde_mina_celula(m, i)
+    return recalcula_contadores(m)
+
+
+# Função Auxiliar
+def tamanho_jogo(dados, inicio):
+    '''
+    tamanho_jogo: bytes x int -> int
+    Devolve o numero de bytes do jogo gravado a partir da posicao inicio de dados.
+    '''
+    tamanho_gerador = dados[inicio] // 8 + 2
+    n = dados[inicio + tamanho_gerador] * dados[inicio + tamanho_gerador + 1]
+    return tamanho_gerador + 2 + (n + 3) // 4 + (n + 7) // 8
+
+
+# ------------------------------------------------------ Arquivo -----------------------------------------------------#
+
+
+def guarda_jogos(caminho, jogos):
+    '''
+    guarda_jogos: str x iteravel -> int
+    Grava no ficheiro caminho um arquivo com os jogos, pares (campo, gerador), pela ordem dada, e devolve o
+    numero de jogos gravados.
+    '''
+    posicoes = array('Q')
+    with open(caminho, 'wb') as ficheiro:
+        ficheiro.write(FORMATO_MAGICO + bytes([FORMATO_VERSAO]))
+        posicao = len(FORMATO_MAGICO) + 1
+        for m, g in jogos:
+            dados = gerador_para_bytes(g) + campo_para_bytes(m)
+            posicoes.append(posicao)
+            ficheiro.write(dados)
+            posicao += len(dados)
+        if sys.byteorder != 'little':
+            posicoes.byteswap()
+        ficheiro.write(posicoes.tobytes())
+        ficheiro.write(struct.pack('<QQ', len(posicoes), posicao))
+    return len(posicoes)
+
+
+def abre_arquivo_jogos(caminho):
+    '''
+    abre_arquivo_jogos: str -> arquivo
+    Abre com mmap o arquivo de jogos gravado em caminho, lendo apenas o cabecalho e o rodape, e devolve-o.
+    Gera um ValueError com a mensagem 'abre_arquivo_jogos: formato invalido' caso o ficheiro nao seja um arquivo
+    de jogos desta versao.
+    '''
+    with open(caminho, 'rb') as ficheiro:
+        mapa = mmap.mmap(ficheiro.fileno(), 0, access=mmap.ACCESS_READ)
+    inicio = len(FORMATO_MAGICO) + 1
+    if len(mapa) < inicio + 16 or mapa[:inicio] != FORMATO_MAGICO + bytes([FORMATO_VERSAO]):
+        mapa.close()
+        raise ValueError('abre_arquivo_jogos: formato invalido')
+    n_jogos, tabela = struct.unpack_from('<QQ', mapa, len(mapa) - 16)
+    return {'mapa': mapa, 'n_jogos': n_jogos, 'tabela': tabela}
+
+
+def obtem_numero_jogos(a):
+    '''
+    obtem_numero_jogos: arquivo -> int
+    Devolve o numero de jogos gravados no arquivo a.
+    '''
+    return a['n_jogos']
+
+
+def carrega_jogo(a, k):
+    '''
+    carrega_jogo: arquivo x int -> tuplo
+    Devolve o par (campo, gerador) do jogo numero k (a contar de 0) do arquivo a, lendo apenas os seus bytes.
+    '''
+    if not 0 <= k < a['n_jogos']:
+        raise IndexError('carrega_jogo: indice invalido')
+    mapa = a['mapa']
+    inicio = struct.unpack_from('<Q', mapa, a['tabela'] + 8 * k)[0]
+    dados = mapa[inicio:inicio + tamanho_jogo(mapa, inicio)]
+    tamanho_gerador = dados[0] // 8 + 2
+    return bytes_para_campo(dados[tamanho_gerador:]), bytes_para_gerador(dados[:tamanho_gerador])
+
+
+def fecha_arquivo_jogos(a):
+    '''
+    fecha_arquivo_jogos: arquivo -> {}
+    Fecha o mapeamento em memoria do arquivo a.
+    '''
+    a['mapa'].close()
+
+
+# -##################################################################################################################-#
+#                                                 TAD REPRODUCAO                                                      #
+# -##################################################################################################################-#
+
+# Uma reproducao repete deterministicamente um jogo registado como os argumentos de minas (c, l, n, d, s) e a lista
+# das jogadas (acao, coordenada) lidas por turno_jogador, sendo a primeira a coordenada inicial. E representada por
+# um dicionario com o registo, o campo de trabalho, a posicao atual (numero de jogadas aplicadas) e instantaneos
+# dos estados das parcelas a cada 'intervalo' jogadas. Como as minas nao mudam depois da primeira jogada, cada
+# instantaneo guarda apenas os bytes dos estados; procurar a jogada k repoe o instantaneo anterior mais proximo
+# (ou continua a partir da posicao atual, se estiver mais perto) e aplica so as jogadas em falta.
+
+# --------------------------------------------------- Construtor -----------------------------------------------------#
+
+
+def cria_reproducao(c, l, n, d, s, jogadas, intervalo=64):
+    '''
+    cria_reproducao: str x int x int x int x int x lista x int -> reproducao
+    Devolve a reproducao do jogo com os argumentos de minas e a lista de jogadas dada, jogando-o uma vez do inicio
+    ao fim para tirar um instantaneo a cada intervalo jogadas. A reproducao fica posicionada no fim do jogo.
+    '''
+    if not argumentos_minas_validos(c, l, n, d, s) or not jogadas or \
+            not isinstance(intervalo, int) or intervalo <= 0:
+        raise ValueError('cria_reproducao: argumentos invalidos')
     m = cria_campo(c, l)
-    n_bandeiras = len(obtem_coordenadas(m, 'marcadas'))
-    bandeiras = '   [Bandeiras ' + str(n_bandeiras) + '/' + str(n) + ']'
-    print(bandeiras)
-    print(campo_para_str(m))
-    c_inicial = str_para_coordenada(input('Escolha uma coordenada:'))
-    coloca_minas(m, c_inicial, g, n)
-    limpa_campo(m, c_inicial)
-    while True:
-        n_bandeiras = len(obtem_coordenadas(m, 'marcadas'))
-        bandeiras = '   [Bandeiras ' + str(n_bandeiras) + '/' + str(n) + ']'
-        print(bandeiras)
-        print(campo_para_str(m))
-        if turno_jogador(m) == False:
-            print(bandeiras)
-            print(campo_para_str(m))
-            print("BOOOOOOOM!!!")
-            return False
+    coloca_minas(m, jogadas[0][1], cria_gerador(d, s), n)
+    r = {'jogadas': list(jogadas), 'campo': m, 'posicao': 0, 'intervalo': intervalo,
+         'instantaneos': {0: bytes(m['estados'])}}
+    avanca_reproducao(r, len(jogadas))
+    return r
+
+
+# ---------------------------------------------------- Seletores -----------------------------------------------------#
+
+
+def obtem_posicao_reproducao(r):
+    '''
+    obtem_posicao_reproducao: reproducao -> int
+    Devolve o numero de jogadas aplicadas ao campo da reproducao r.
+    '''
+    return r['posicao']
+
+
+def obtem_campo_reproducao(r):
+    '''
+    obtem_campo_reproducao: reproducao -> campo
+    Devolve o campo de trabalho da reproducao r, no estado correspondente a sua posicao atual.
+    '''
+    return r['campo']
+
+
+# -------------------------------------------------- Modificadores ---------------------------------------------------#
+
+
+# Função Auxiliar
+def avanca_reproducao(r, k):
+    '''
+    avanca_reproducao: reproducao x int -> reproducao
+    Aplica ao campo de r as jogadas desde a posicao atual ate a posicao k, guardando os instantaneos em falta,
+    e devolve a reproducao.
+    '''
+    m, jogadas, intervalo = r['campo'], r['jogadas'], r['intervalo']
+    for posicao in range(r['posicao'], k):
+        acao, coordenada = jogadas[posicao]
+        aplica_jogada(m, acao, coordenada)
+        if (posicao + 1) % intervalo == 0 and posicao + 1 not in r['instantaneos']:
+            r['instantaneos'][posicao + 1] = bytes(m['estados'])
+    r['posicao'] = k
+    return r
+
+
+def procura_jogada(r, k):
+    '''
+    procura_jogada: reproducao x int -> campo
+    Coloca a reproducao r na posicao k (0 <= k <= numero de jogadas) e devolve o seu campo, com o estado que o jogo
+    tinha depois das primeiras k jogadas.
+    '''
+    if not isinstance(k, int) or not 0 <= k <= len(r['jogadas']):
+        raise ValueError('procura_jogada: argumentos invalidos')
+    base = k - k % r['intervalo']
+    if not base <= r['posicao'] <= k:
+        m = separa_buffers(r['campo'], 'estados')
+        m['estados'][:] = r['instantaneos'][base]
+        recalcula_contadores(m)
+        r['posicao'] = base
+    avanca_reproducao(r, k)
+    return r['campo']
+
+
+# -##################################################################################################################-#
+#                                                      TAD DIARIO                                                     #
+# -##################################################################################################################-#
+
+# O diario regista as jogadas feitas num campo, ja com as minas colocadas, para as poder desfazer e refazer. Cada
+# entrada e um array de inteiros de 16 bits, um por parcela que a jogada alterou, com o numero da celula nos bits
+# altos e o codigo do estado anterior (ESTADO_PARA_CODIGO) nos 2 bits baixos. Desfazer aplica os estados anteriores
+# de uma entrada e guarda na pilha 'refazer' a entrada inversa, com os estados que substituiu; refazer faz o mesmo
+# no sentido contrario, pelo que ambos custam O(parcelas alteradas). Todas as jogadas no campo devem passar pelo
+# diario. A memoria das entradas e dos pontos e limitada por 'orcamento' bytes: quando e excedida, as entradas mais
+# antigas sao compactadas num ponto, os estados de todas as parcelas empacotados em 2 bits nessa posicao, para o
+# qual se pode voltar com restaura_ponto_diario mas ja nao jogada a jogada. Os pontos mais antigos sao descartados
+# se os pontos sozinhos excederem o orcamento.
+
+# Memoria contabilizada por entrada, alem dos 2 bytes por parcela alterada
+CUSTO_ENTRADA_DIARIO = 64
+
+# --------------------------------------------------- Construtor -----------------------------------------------------#
+
+
+def cria_diario(m, orcamento=1 << 16):
+    '''
+    cria_diario: campo x int -> diario
+    Devolve um diario vazio das jogadas no campo m, cujas entradas e pontos ocupam no maximo orcamento bytes depois
+    de cada jogada. Um orcamento menor do que um ponto ((parcelas + 3) // 4 + CUSTO_ENTRADA_DIARIO bytes) e
+    excedido pelo ponto mais recente, que e sempre mantido. A posicao inicial do diario e 0.
+    '''
+    if not isinstance(orcamento, int) or orcamento <= 0:
+        raise ValueError('cria_diario: argumentos invalidos')
+    return {'campo': m, 'orcamento': orcamento, 'posicao': 0, 'entradas': deque(), 'refazer': [],
+            'pontos': deque(), 'memoria': 0}
+
+
+# ---------------------------------------------------- Seletores -----------------------------------------------------#
+
+
+def obtem_posicao_diario(d):
+    '''
+    obtem_posicao_diario: diario -> int
+    Devolve o numero de jogadas registadas no diario d e nao desfeitas.
+    '''
+    return d['posicao']
+
+
+def obtem_pontos_diario(d):
+    '''
+    obtem_pontos_diario: diario -> lista
+    Devolve a lista ordenada das posicoes dos pontos do diario d.
+    '''
+    return [posicao for posicao, _ in d['pontos']]
+
+
+def obtem_memoria_diario(d):
+    '''
+    obtem_memoria_diario: diario -> int
+    Devolve a memoria, em bytes, contabilizada para as entradas, as entradas a refazer e os pontos do diario d.
+    '''
+    return d['memoria']
+
+
+# -------------------------------------------------- Modificadores ---------------------------------------------------#
+
+
+# Função Auxiliar
+def custo_entrada_diario(entrada):
+    '''
+    custo_entrada_diario: array -> int
+    Devolve a memoria contabilizada para a entrada do diario.
+    '''
+    return CUSTO_ENTRADA_DIARIO + 2 * len(entrada)
+
+
+# Função Auxiliar
+def aplica_entrada_diario(m, entrada):
+    '''
+    aplica_entrada_diario: campo x array -> array
+    Repoe no campo m os estados guardados na entrada e devolve a entrada inversa, com os estados substituidos.
+    '''
+    estados = separa_buffers(m, 'estados')['estados']
+    inversa = array('H', [0]) * len(entrada)
+    for k, valor in enumerate(entrada):
+        i = valor >> 2
+        inversa[k] = i << 2 | ESTADO_PARA_CODIGO[estados[i]]
+        altera_estado_celula(m, i, b'#?@'[valor & 3])
+    return inversa
+
+
+def joga_diario(d, acao, c):
+    '''
+    joga_diario: diario x str x coordenada -> booleano
+    Aplica ao campo do diario d a acao ('L' para limpar, 'M' para marcar ou 'A' para o acorde) na coordenada c,
+    como aplica_jogada, e regista as parcelas alteradas, descartando as jogadas desfeitas. Devolve o mesmo que
+    aplica_jogada.
+    '''
+    m = d['campo']
+    if acao not in ('L', 'M', 'A') or not eh_coordenada_do_campo(m, c):
+        return None
+    i = obtem_indice(m, c)
+    anterior = m['estados'][i]
+    if acao == 'A':
+        # O acorde so limpa celulas tapadas, cujo estado anterior tem o codigo 0
+        reveladas = limpa_acorde_celulas(m, i)
+        if not reveladas:
+            return None
+        entrada = array('H', (j << 2 for j in reveladas))
+    elif anterior == LIMPA:
+        return None
+    elif acao == 'M':
+        altera_estado_celula(m, i, TAPADA if anterior == MARCADA else MARCADA)
+        entrada = array('H', (i << 2 | ESTADO_PARA_CODIGO[anterior],))
+    else:
+        # limpa_celulas devolve primeiro a celula i, com o estado anterior, e depois as tapadas da cascata
+        entrada = array('H', (j << 2 for j in limpa_celulas(m, i)))
+        entrada[0] |= ESTADO_PARA_CODIGO[anterior]
+
+    d['memoria'] -= sum(map(custo_entrada_diario, d['refazer']))
+    d['refazer'].clear()
+    d['entradas'].append(entrada)
+    d['memoria'] += custo_entrada_diario(entrada)
+    d['posicao'] += 1
+    if d['memoria'] > d['orcamento']:
+        compacta_diario(d)
+    if acao == 'A':
+        minas_campo = m['minas']
+        return not any(minas_campo[valor >> 2] for valor in entrada)
+    return acao == 'M' or not m['minas'][i]
+
+
+def desfaz_jogada(d):
+    '''
+    desfaz_jogada: diario -> booleano
+    Desfaz a ultima jogada registada no diario d. Devolve False, sem alterar o campo, caso nao haja jogadas
+    registadas depois do ultimo ponto.
+    '''
+    if not d['entradas']:
+        return False
+    d['refazer'].append(aplica_entrada_diario(d['campo'], d['entradas'].pop()))
+    d['posicao'] -= 1
+    return True
+
+
+def refaz_jogada(d):
+    '''
+    refaz_jogada: diario -> booleano
+    Refaz a ultima jogada desfeita no diario d. Devolve False caso nao haja jogadas desfeitas.
+    '''
+    if not d['refazer']:
+        return False
+    d['entradas'].append(aplica_entrada_diario(d['campo'], d['refazer'].pop()))
+    d['posicao'] += 1
+    return True
+
+
+def compacta_diario(d):
+    '''
+    compacta_diario: diario -> diario
+    Compacta as entradas mais antigas do diario d num ponto, ate as entradas restantes ocuparem no maximo metade
+    do orcamento, e descarta os pontos mais antigos enquanto o orcamento estiver excedido, ficando sempre o mais
+    recente. Devolve o diario.
+    '''
+    entradas = d['entradas']
+    custo = sum(map(custo_entrada_diario, entradas))
+    descartadas = 0
+    while entradas and custo > d['orcamento'] // 2:
+        custo -= custo_entrada_diario(entradas.popleft())
+        descartadas += 1
+    if descartadas:
+        # Estados na posicao da entrada mais antiga que ficou: os atuais com todas as restantes entradas desfeitas
+        estados = bytearray(d['campo']['estados'])
+        for entrada in reversed(entradas):
+            for valor in entrada:
+                estados[valor >> 2] = b'#?@'[valor & 3]
+        ponto = empacota_estados(estados)
+        d['pontos'].append((d['posicao'] - len(entradas), ponto))
+    d['memoria'] = custo + sum(map(custo_entrada_diario, d['refazer'])) + \
+        sum(CUSTO_ENTRADA_DIARIO + len(ponto) for _, ponto in d['pontos'])
+    while len(d['pontos']) > 1 and d['memoria'] > d['orcamento']:
+        d['memoria'] -= CUSTO_ENTRADA_DIARIO + len(d['pontos'].popleft()[1])
+    return d
+
+
+def restaura_ponto_diario(d, posicao):
+    '''
+    restaura_ponto_diario: diario x int -> diario
+    Repoe o campo do diario d no ponto com a posicao dada, em O(parcelas do campo), descartando as entradas, as
+    entradas a refazer e os pontos posteriores, e devolve o diario. Gera um ValueError com a mensagem
+    'restaura_ponto_diario: argumentos invalidos' caso o diario nao tenha um ponto nessa posicao.
+    '''
+    pontos = d['pontos']
+    if posicao not in obtem_pontos_diario(d):
+        raise ValueError('restaura_ponto_diario: argumentos invalidos')
+    while pontos[-1][0] != posicao:
+        pontos.pop()
+    m = separa_buffers(d['campo'], 'estados')
+    m['estados'][:] = desempacota_estados(pontos[-1][1], len(m['estados']))
+    recalcula_contadores(m)
+    d['entradas'].clear()
+    d['refazer'].clear()
+    d['posicao'] = posicao
+    return compacta_diario(d)
+
+
+# -##################################################################################################################-#
+#                                                     SIMULACAO                                                       #
+# -##################################################################################################################-#
+
+# Jogos sem interacao com a consola, para correr em massa partidas com seeds fixas. A origem das jogadas e uma lista
+# de pares (acao, coordenada) ou uma politica: uma funcao que recebe o campo e devolve o proximo par, ou None para
+# terminar. Como em minas, a primeira jogada valida e uma limpeza ('L'), cuja coordenada e a coordenada inicial usada
+# para colocar as minas; as jogadas anteriores sao ignoradas. Para correr num conjunto de processos, as politicas
+# tem de ser funcoes definidas ao nivel do modulo.
+
+# ------------------------------------------------------ Partida -----------------------------------------------------#
+
+
+def politica_sequencial(m):
+    '''
+    politica_sequencial: campo -> tuplo
+    Politica de referencia que limpa sempre a primeira parcela tapada do campo m, da esquerda para a direita e de
+    cima para baixo.
+    '''
+    i = m['estados'].find(TAPADA)
+    if i == -1:
+        return None
+    return ('L', obtem_coordenada_indice(m, i))
+
+
+def joga_partida(c, l, n, d, s, jogadas, cache=None):
+    '''
+    joga_partida: str x int x int x int x int x (lista ou funcao) x cache -> dicionario
+    Joga sem entrada nem saida de dados uma partida com os argumentos de minas, obtendo as jogadas de jogadas
+    (lista de pares (acao, coordenada) ou politica). As jogadas invalidas sao ignoradas, como em turno_jogador, e uma
+    politica e consultada no maximo 4 vezes por parcela do campo. Devolve um dicionario com as chaves 'ganho'
+    (True, False ou None se as jogadas acabarem antes do fim), 'jogadas' (jogadas aplicadas), 'limpas',
+    'marcadas', 'registo' (lista das jogadas aplicadas) e 'tempo' (segundos), e ainda 'instrumentacao' com o
+    resumo das metricas da partida se a instrumentacao estiver ativa. As minas sao obtidas da cache (por omissao,
+    CACHE_CAMPOS) quando possivel.
+    '''
+    if not argumentos_minas_validos(c, l, n, d, s):
+        raise ValueError('joga_partida: argumentos invalidos')
+    if INSTRUMENTACAO['ativa']:
+        reinicia_instrumentacao()
+
+    inicio = time.perf_counter()
+    g = cria_gerador(d, s)
+    m = cria_campo(c, l)
+    if callable(jogadas):
+        politica = jogadas
+        origem = (politica(m) for _ in range(4 * len(m['estados'])))
+    else:
+        origem = iter(jogadas)
+
+    ganho = None
+    registo = []
+    for jogada in origem:
+        if jogada is None:
+            break
+        acao, coordenada = jogada
+        if not registo:
+            # Como em minas, a primeira jogada e sempre uma limpeza, que define a coordenada inicial
+            if acao != 'L' or not eh_coordenada_do_campo(m, coordenada):
+                continue
+            coloca_minas_cache(CACHE_CAMPOS if cache is None else cache, m, coordenada, g, n)
+        resultado = aplica_jogada(m, acao, coordenada)
+        if resultado is None:
+            continue
+        registo.append((acao, coordenada))
+        if resultado == False:
+            ganho = False
+            break
         if jogo_ganho(m):
-            print(bandeiras)
-            print(campo_para_str(m))
-            print("VITORIA!!!")
-            return True
+            ganho = True
+            break
+
+    resultado = {'ganho': ganho, 'jogadas': len(registo),
+                 'limpas': obtem_numero_parcelas(m, 'limpas'), 'marcadas': obtem_numero_parcelas(m, 'marcadas'),
+                 'registo': registo, 'tempo': time.perf_counter() - inicio}
+    if INSTRUMENTACAO['ativa']:
+        resultado['instrumentacao'] = obtem_resumo_instrumentacao()
+    return resultado
+
+
+# ------------------------------------------------------ Lotes -------------------------------------------------------#
+
+
+# Função Auxiliar
+def joga_trabalho(trabalho):
+    '''
+    joga_trabalho: tuplo -> dicionario
+    Joga a partida descrita pelo tuplo (c, l, n, d, s, jogadas) e devolve o seu resultado com a seed.
+    Definida ao nivel do modulo para poder ser enviada para os processos de trabalho.
+    '''
+    resultado = joga_partida(*trabalho)
+    resultado['seed'] = trabalho[4]
+    return resultado
+
+
+def joga_partidas(c, l, n, d, trabalhos, processos=None, tamanho_bloco=16):
+    '''
+    joga_partidas: str x int x int x int x lista x int x int -> dicionario
+    Joga uma partida por cada par (seed, jogadas) de trabalhos num campo de ultima coluna c e ultima linha l com
+    n minas e gerador de d bits, distribuindo-as por um ProcessPoolExecutor com processos processos (por omissao,
+    um por CPU) em blocos de tamanho_bloco partidas. Se processos for 0, as partidas correm no proprio processo.
+    Devolve um dicionario com as estatisticas agregadas e a lista 'resultados' com o resultado de cada partida.
+    '''
+    lote = [(c, l, n, d, s, jogadas) for s, jogadas in trabalhos]
+    inicio = time.perf_counter()
+    if processos == 0:
+        resultados = [joga_trabalho(trabalho) for trabalho in lote]
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            resultados = list(executor.map(joga_trabalho, lote, chunksize=tamanho_bloco))
+
+    vitorias = sum(1 for r in resultados if r['ganho'] == True)
+    derrotas = sum(1 for r in resultados if r['ganho'] == False)
+    total = len(resultados)
+    return {'partidas': total, 'vitorias': vitorias, 'derrotas': derrotas,
+            'incompletas': total - vitorias - derrotas,
+            'taxa_vitoria': vitorias / total if total else 0.0,
+            'jogadas_media': sum(r['jogadas'] for r in resultados) / total if total else 0.0,
+            'tempo_partidas': sum(r['tempo'] for r in resultados),
+            'tempo_total': time.perf_counter() - inicio,
+            'resultados': resultados}
+
+
+# -##################################################################################################################-#
+#                                                       SERVIDOR                                                      #
+# -##################################################################################################################-#
+
+# Servidor asyncio que aloja varios jogadores num unico processo. Cada ligacao TCP e uma sessao com o seu campo e o
+# seu gerador. O protocolo e de linhas de texto: o cliente envia um comando por linha e o servidor responde com uma
+# linha 'OK ...' ou 'ERRO ...', exceto o comando CAMPO, que responde com as linhas do campo seguidas de 'FIM'.
+#   NOVO c l n d s   comeca um jogo com os argumentos de minas; a primeira limpeza (L) coloca as minas
+#   L xNN ou M xNN   limpa ou marca/desmarca uma parcela, lida como em turno_jogador; responde 'OK JOGO',
+#                    'OK BOOM' ou 'OK VITORIA'; antes da primeira limpeza, M responde 'ERRO jogada invalida'
+#   A xNN            limpa em acorde as vizinhas de uma parcela limpa, como em turno_jogador; responde como L
+#   CAMPO            envia o campo desenhado como em minas
+#   SAIR             termina a sessao
+# As sessoes sem comandos durante tempo_inativo segundos sao terminadas, e a partir de max_sessoes sessoes as novas
+# ligacoes sao recusadas. Cada sessao trata um comando de cada vez e so le o seguinte depois de a resposta ser
+# escoada para o cliente, pelo que um cliente que nao le as respostas deixa de ser lido. As limpezas que se podem
+# propagar por mais de limiar_cascata parcelas correm numa thread do executor do ciclo de eventos, para nao o
+# bloquearem. A colocacao das minas usa a cache partilhada e corre sempre no ciclo de eventos.
+
+COMPRIMENTO_MAXIMO_LINHA = 1024
+
+# ----------------------------------------------------- Sessoes ------------------------------------------------------#
+
+
+def cria_sessao():
+    '''
+    cria_sessao: {} -> sessao
+    Devolve uma sessao sem jogo: um dicionario com o campo, o gerador, o numero de minas e o visualizador do jogo
+    da sessao, e a indicacao de o jogo ter terminado.
+    '''
+    return {'campo': None, 'gerador': None, 'minas': 0, 'visualizador': None, 'iniciado': False,
+            'terminado': False}
+
+
+# Função Auxiliar
+def novo_jogo_sessao(sessao, argumentos):
+    '''
+    novo_jogo_sessao: sessao x lista -> booleano
+    Comeca na sessao um jogo com os argumentos de minas dados como cadeias de caracteres [c, l, n, d, s]. Devolve
+    False, sem alterar a sessao, caso os argumentos nao sejam validos.
+    '''
+    if len(argumentos) != 5 or not all(a.isdigit() for a in argumentos[1:]):
+        return False
+    c, (l, n, d, s) = argumentos[0], map(int, argumentos[1:])
+    if not argumentos_minas_validos(c, l, n, d, s):
+        return False
+    m = cria_campo(c, l)
+    sessao.update({'campo': m, 'gerador': cria_gerador(d, s), 'minas': n, 'visualizador': cria_visualizador(m),
+                   'iniciado': False, 'terminado': False})
+    return True
+
+
+# Função Auxiliar
+def eh_limpeza_pesada(m, acao, c, limiar):
+    '''
+    eh_limpeza_pesada: campo x str x coordenada x int -> booleano
+    Devolve True caso a acao 'L' ou 'A' na coordenada c do campo m possa revelar mais de limiar parcelas: ha mais
+    de limiar parcelas por limpar e a parcela a limpar (em 'L') ou uma das vizinhas (em 'A') esta tapada e nao tem
+    minas nem minas vizinhas.
+    '''
+    if obtem_numero_parcelas(m, 'por_limpar') <= limiar:
+        return False
+    i = obtem_indice(m, c)
+    celulas = (i,) if acao == 'L' else obtem_indices_vizinhos(m, i)
+    estados, minas_campo, vizinhas = m['estados'], m['minas'], m['vizinhas']
+    return any(estados[j] == TAPADA and vizinhas[j] == 0 and not minas_campo[j] for j in celulas)
+
+
+async def joga_sessao(servidor, sessao, acao, c):
+    '''
+    joga_sessao: servidor x sessao x str x coordenada -> str
+    Aplica a jogada (acao, c) ao jogo da sessao como turno_jogador, colocando as minas na primeira limpeza, e
+    devolve a resposta do protocolo; antes desta, as outras jogadas sao invalidas. As limpezas pesadas correm no
+    executor do ciclo de eventos.
+    '''
+    m = sessao['campo']
+    if m is None or sessao['terminado']:
+        return 'ERRO sem jogo'
+    if acao not in ('L', 'M', 'A') or not eh_coordenada_do_campo(m, c) or \
+            (acao == 'A') != eh_parcela_limpa(obtem_parcela(m, c)):
+        return 'ERRO jogada invalida'
+    if not sessao['iniciado']:
+        # Como em minas, so uma limpeza pode ser a primeira jogada, que coloca as minas
+        if acao != 'L':
+            return 'ERRO jogada invalida'
+        cache = CACHE_CAMPOS if servidor['cache'] is None else servidor['cache']
+        coloca_minas_cache(cache, m, c, sessao['gerador'], sessao['minas'])
+        sessao['iniciado'] = True
+    if acao != 'M' and eh_limpeza_pesada(m, acao, c, servidor['limiar_cascata']):
+        servidor['limpezas_executor'] += 1
+        resultado = await asyncio.get_running_loop().run_in_executor(None, aplica_jogada, m, acao, c)
+    else:
+        resultado = aplica_jogada(m, acao, c)
+    if resultado is None:
+        return 'ERRO jogada invalida'
+    if resultado == False:
+        sessao['terminado'] = True
+        return 'OK BOOM'
+    if jogo_ganho(m):
+        sessao['terminado'] = True
+        return 'OK VITORIA'
+    return 'OK JOGO'
+
+
+async def responde_comando(servidor, sessao, linha):
+    '''
+    responde_comando: servidor x sessao x str -> tuplo
+    Executa o comando do protocolo na linha linha sobre a sessao, e devolve o par (resposta, continuar), em que
+    continuar e False caso a sessao deva terminar.
+    '''
+    partes = linha.split()
+    if not partes:
+        return 'ERRO comando invalido', True
+    comando = partes[0]
+    if comando in ('L', 'M', 'A') and len(partes) == 2:
+        if not valida_coordenada(partes[1]):
+            return 'ERRO jogada invalida', True
+        return await joga_sessao(servidor, sessao, comando, str_para_coordenada(partes[1])), True
+    if comando == 'NOVO':
+        return ('OK' if novo_jogo_sessao(sessao, partes[1:]) else 'ERRO argumentos invalidos'), True
+    if comando == 'CAMPO' and len(partes) == 1:
+        if sessao['campo'] is None:
+            return 'ERRO sem jogo', True
+        bandeiras = bandeiras_para_str(sessao['campo'], sessao['minas'])
+        return jogo_para_str(sessao['visualizador'], bandeiras) + '\nFIM', True
+    if comando == 'SAIR' and len(partes) == 1:
+        return 'OK ADEUS', False
+    return 'ERRO comando invalido', True
+
+
+# ----------------------------------------------------- Ligacoes -----------------------------------------------------#
+
+
+async def trata_ligacao(servidor, reader, writer):
+    '''
+    trata_ligacao: servidor x StreamReader x StreamWriter -> {}
+    Serve uma ligacao como uma sessao, ate o cliente a fechar, enviar SAIR, ficar inativo durante tempo_inativo
+    segundos ou deixar de ler as respostas durante esse tempo. Recusa a ligacao se o servidor estiver cheio.
+    '''
+    if len(servidor['sessoes']) >= servidor['max_sessoes']:
+        servidor['recusadas'] += 1
+        writer.write(b'ERRO servidor cheio\n')
+        writer.close()
+        return
+    chave = servidor['proxima_sessao']
+    servidor['proxima_sessao'] += 1
+    sessao = servidor['sessoes'][chave] = cria_sessao()
+    try:
+        while True:
+            try:
+                linha = await asyncio.wait_for(reader.readline(), servidor['tempo_inativo'])
+            except asyncio.TimeoutError:
+                servidor['expiradas'] += 1
+                writer.write(b'ERRO sessao expirada\n')
+                break
+            except ValueError:
+                writer.write(b'ERRO linha demasiado longa\n')
+                break
+            if not linha:
+                break
+            resposta, continuar = await responde_comando(servidor, sessao, linha.decode('utf-8', 'replace'))
+            writer.write(resposta.encode() + b'\n')
+            try:
+                await asyncio.wait_for(writer.drain(), servidor['tempo_inativo'])
+            except asyncio.TimeoutError:
+                servidor['expiradas'] += 1
+                break
+            if not continuar:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        del servidor['sessoes'][chave]
+        writer.close()
+
+
+# ----------------------------------------------------- Servidor -----------------------------------------------------#
+
+
+def cria_servidor(max_sessoes=1024, tempo_inativo=300.0, limiar_cascata=256, cache=None):
+    '''
+    cria_servidor: int x float x int x cache -> servidor
+    Devolve um servidor ainda por abrir que aceita no maximo max_sessoes sessoes em simultaneo, termina as sessoes
+    inativas ha tempo_inativo segundos e corre no executor as limpezas que possam revelar mais de limiar_cascata
+    parcelas. As minas sao obtidas da cache (por omissao, CACHE_CAMPOS).
+    '''
+    if not isinstance(max_sessoes, int) or max_sessoes < 1 or not isinstance(tempo_inativo, (int, float)) or \
+            tempo_inativo <= 0 or not isinstance(limiar_cascata, int) or limiar_cascata < 0:
+        raise ValueError('cria_servidor: argumentos invalidos')
+    return {'max_sessoes': max_sessoes, 'tempo_inativo': tempo_inativo, 'limiar_cascata': limiar_cascata,
+            'cache': cache, 'sessoes': {}, 'proxima_sessao': 0, 'servidor': None,
+            'recusadas': 0, 'expiradas': 0, 'limpezas_executor': 0}
+
+
+async def abre_servidor(servidor, anfitriao='127.0.0.1', porta=0):
+    '''
+    abre_servidor: servidor x str x int -> int
+    Comeca a aceitar ligacoes no endereco anfitriao e na porta dada (0 para uma porta livre), e devolve a porta.
+    '''
+    servidor['servidor'] = await asyncio.start_server(
+        lambda reader, writer: trata_ligacao(servidor, reader, writer), anfitriao, porta,
+        limit=COMPRIMENTO_MAXIMO_LINHA)
+    return servidor['servidor'].sockets[0].getsockname()[1]
+
+
+async def fecha_servidor(servidor):
+    '''
+    fecha_servidor: servidor -> {}
+    Deixa de aceitar ligacoes e espera que o servidor feche.
+    '''
+    servidor['servidor'].close()
+    await servidor['servidor'].wait_closed()
+
+
+def servidor_minas(anfitriao='127.0.0.1', porta=4242, **opcoes):
+    '''
+    servidor_minas: str x int -> {}
+    Corre o servidor de jogos no endereco e porta dados ate o processo ser interrompido. As opcoes sao as de
+    cria_servidor.
+    '''
+    async def serve():
+        servidor = cria_servidor(**opcoes)
+        await abre_servidor(servidor, anfitriao, porta)
+        await servidor['servidor'].serve_forever()
+
+    asyncio.run(serve())
+
+
+# -##################################################################################################################-#
+#                                                  INSTRUMENTACAO                                                     #
+# -##################################################################################################################-#
+
+# Registo opcional de metricas dos caminhos criticos. Cada metrica guarda [total, numero de registos, maximo]; os
+# tempos sao metricas em segundos. Os pontos de medida so consultam INSTRUMENTACAO['ativa'], pelo que o custo com a
+# instrumentacao desativada e uma consulta a um dicionario por chamada. minas e joga_partida reiniciam o registo no
+# inicio de cada jogo, de modo a que o resumo corresponda a uma partida.
+
+INSTRUMENTACAO = {'ativa': False, 'metricas': {}, 'perfil': None}
+
+
+def ativa_instrumentacao(perfil=False):
+    '''
+    ativa_instrumentacao: booleano -> {}
+    Ativa o registo de metricas e, se perfil for True, tambem um perfil do cProfile de todas as chamadas.
+    '''
+    INSTRUMENTACAO['ativa'] = True
+    if perfil and INSTRUMENTACAO['perfil'] is None:
+        INSTRUMENTACAO['perfil'] = cProfile.Profile()
+        INSTRUMENTACAO['perfil'].enable()
+
+
+def desativa_instrumentacao():
+    '''
+    desativa_instrumentacao: {} -> {}
+    Desativa o registo de metricas e o perfil, mantendo os valores ja registados.
+    '''
+    INSTRUMENTACAO['ativa'] = False
+    if INSTRUMENTACAO['perfil'] is not None:
+        INSTRUMENTACAO['perfil'].disable()
+
+
+def reinicia_instrumentacao():
+    '''
+    reinicia_instrumentacao: {} -> {}
+    Apaga todas as metricas registadas.
+    '''
+    INSTRUMENTACAO['metricas'] = {}
+
+
+def regista_metrica(nome, valor):
+    '''
+    regista_metrica: str x numero -> {}
+    Acrescenta o valor a metrica nome, atualizando o total, o numero de registos e o maximo.
+    '''
+    metrica = INSTRUMENTACAO['metricas'].get(nome)
+    if metrica is None:
+        INSTRUMENTACAO['metricas'][nome] = [valor, 1, valor]
+    else:
+        metrica[0] += valor
+        metrica[1] += 1
+        if valor > metrica[2]:
+            metrica[2] = valor
+
+
+def obtem_resumo_instrumentacao():
+    '''
+    obtem_resumo_instrumentacao: {} -> dicionario
+    Devolve um dicionario que associa a cada metrica registada um dicionario com 'total', 'n', 'media' e 'max'.
+    '''
+    return {nome: {'total': total, 'n': n, 'media': total / n, 'max': maximo}
+            for nome, (total, n, maximo) in INSTRUMENTACAO['metricas'].items()}
+
+
+def guarda_perfil(caminho):
+    '''
+    guarda_perfil: str -> {}
+    Para o perfil do cProfile e grava-o em caminho no formato lido pelo modulo pstats.
+    Gera um ValueError caso o perfil nao tenha sido ativado.
+    '''
+    perfil = INSTRUMENTACAO['perfil']
+    if perfil is None:
+        raise ValueError('guarda_perfil: perfil nao ativado')
+    perfil.disable()
+    perfil.dump_stats(caminho)
+    INSTRUMENTACAO['perfil'] = None
+
+
+# -##################################################################################################################-#
+#                                              AVALIACAO DE DESEMPENHO                                                #
+# -##################################################################################################################-#
+
+# ------------------------------------------------- Abertura do campo ------------------------------------------------#
+
+
+def avalia_abertura(d=32, s=1, n=10, repeticoes=20):
+    '''
+    avalia_abertura: int x int x int x int -> float
+    Mede a latencia da jogada de abertura no maior campo legal (Z99) com n minas, gerador de d bits e seed s:
+    coloca as minas a partir da coordenada central e limpa-a, propagando a limpeza pelo campo.
+    Devolve o melhor tempo, em segundos, de entre as repeticoes.
+    '''
+    c = cria_coordenada('M', 50)
+    melhor = None
+    for _ in range(repeticoes):
+        m = cria_campo('Z', 99)
+        coloca_minas(m, c, cria_gerador(d, s), n)
+        inicio = time.perf_counter()
+        limpa_campo(m, c)
+        tempo = time.perf_counter() - inicio
+        if melhor is None or tempo < melhor:
+            melhor = tempo
+    return melhor
+
+
+# ---------------------------------------------------- Resolvedor ----------------------------------------------------#
+
+
+def avalia_resolvedor(c='Z', l=16, n=80, d=32, seeds=range(1, 51)):
+    '''
+    avalia_resolvedor: str x int x int x int x iteravel -> float
+    Mede o debito do resolvedor: para cada seed, coloca n minas num campo de ultima coluna c e ultima linha l a
+    partir da coordenada central, limpa-a e corre resolve_campo. Devolve o numero de parcelas resolvidas
+    (limpas ou marcadas pelo resolvedor) por segundo.
+    '''
+    centro = cria_coordenada(chr((ord(c) + ord('A')) // 2), (l + 1) // 2)
+    resolvidas = 0
+    tempo = 0.0
+    for s in seeds:
+        m = cria_campo(c, l)
+        coloca_minas(m, centro, cria_gerador(d, s), n)
+        limpa_campo(m, centro)
+        antes = obtem_numero_parcelas(m, 'limpas') + obtem_numero_parcelas(m, 'marcadas')
+        inicio = time.perf_counter()
+        resolve_campo(m)
+        tempo += time.perf_counter() - inicio
+        resolvidas += obtem_numero_parcelas(m, 'limpas') + obtem_numero_parcelas(m, 'marcadas') - antes
+    return resolvidas / tempo if tempo else 0.0
+
+
+# ----------------------------------------------------- Reproducao ---------------------------------------------------#
+
+
+def avalia_procura(n=400, d=32, s=1, intervalo=64, procuras=200):
+    '''
+    avalia_procura: int x int x int x int x int -> tuplo
+    Mede a latencia de procura_jogada num jogo longo no campo Z99 com n minas: a primeira jogada limpa o centro e
+    as seguintes alternam bandeiras e limpam parcelas sem mina por uma ordem pseudoaleatoria fixa. Devolve o par
+    (numero de jogadas, tempo medio em segundos de uma procura para uma jogada aleatoria).
+    '''
+    c = cria_coordenada('M', 50)
+    m = cria_campo('Z', 99)
+    coloca_minas(m, c, cria_gerador(d, s), n)
+    g = cria_gerador(d, s)
+    jogadas = [('L', c)]
+    for i in range(len(m['estados'])):
+        j = gera_numero_aleatorio(g, len(m['estados'])) - 1
+        jogadas.append(('M', obtem_coordenada_indice(m, j)))
+        if not m['minas'][i]:
+            jogadas.append(('L', obtem_coordenada_indice(m, i)))
+            jogadas.append(('M', obtem_coordenada_indice(m, j)))
+
+    r = cria_reproducao('Z', 99, n, d, s, jogadas, intervalo)
+    inicio = time.perf_counter()
+    for _ in range(procuras):
+        procura_jogada(r, gera_numero_aleatorio(g, len(jogadas) + 1) - 1)
+    return len(jogadas), (time.perf_counter() - inicio) / procuras
+
+
+# ----------------------------------------------------- Servidor -----------------------------------------------------#
+
+
+# Função Auxiliar
+async def cliente_carga(porta, k, c, l, n, d, jogadas, latencias):
+    '''
+    cliente_carga: int x int x str x int x int x int x int x lista -> {}
+    Cliente k do teste de carga: abre uma sessao no servidor local na porta dada e envia jogadas jogadas L em
+    coordenadas pseudoaleatorias, comecando um jogo novo sempre que o anterior termina, e junta a latencias o tempo
+    de resposta de cada jogada.
+    '''
+    reader, writer = await asyncio.open_connection('127.0.0.1', porta, limit=COMPRIMENTO_MAXIMO_LINHA)
+    g = cria_gerador(d, k + 1)
+    ultima = cria_coordenada(c, l)
+    resposta = b'OK VITORIA'
+    for _ in range(jogadas):
+        if resposta in (b'OK BOOM', b'OK VITORIA'):
+            writer.write(('NOVO ' + ' '.join((c, str(l), str(n), str(d), str(gera_numero_aleatorio(g, 2 ** 31)))) +
+                          '\n').encode())
+            await reader.readline()
+        pedido = ('L ' + coordenada_para_str(obtem_coordenada_aleatoria(ultima, g)) + '\n').encode()
+        inicio = time.perf_counter()
+        writer.write(pedido)
+        resposta = (await reader.readline()).rstrip()
+        latencias.append(time.perf_counter() - inicio)
+    writer.write(b'SAIR\n')
+    await reader.readline()
+    writer.close()
+
+
+def avalia_servidor(sessoes=100, jogadas=50, c='P', l=16, n=40, d=32):
+    '''
+    avalia_servidor: int x int x str x int x int x int -> dicionario
+    Teste de carga do servidor: abre um servidor local e sessoes clientes em simultaneo, cada um com jogadas
+    jogadas num campo de ultima coluna c e ultima linha l com n minas. Devolve um dicionario com o numero de
+    sessoes e de jogadas, os percentis 50 e 99 e o maximo da latencia de uma jogada, em segundos, e o debito em
+    jogadas por segundo.
+    '''
+    async def carga():
+        servidor = cria_servidor(max_sessoes=sessoes)
+        porta = await abre_servidor(servidor)
+        latencias = []
+        inicio = time.perf_counter()
+        await asyncio.gather(*(cliente_carga(porta, k, c, l, n, d, jogadas, latencias) for k in range(sessoes)))
+        tempo = time.perf_counter() - inicio
+        await fecha_servidor(servidor)
+        return latencias, tempo
+
+    latencias, tempo = asyncio.run(carga())
+    latencias.sort()
+    total = len(latencias)
+    return {'sessoes': sessoes, 'jogadas': total,
+            'p50': latencias[total // 2], 'p99': latencias[min(total - 1, total * 99 // 100)],
+            'maximo': latencias[-1], 'debito': total / tempo}
+
+
+# ---------------------------------------------------- Suite completa ------------------------------------------------#
+
+# Campos da suite, como (nome, ultima coluna, ultima linha). O campo 16x30 fica com 16 colunas e 30 linhas, porque o
+# campo tem no maximo 26 colunas.
+CAMPOS_BENCHMARK = (('8x8', 'H', 8), ('16x16', 'P', 16), ('16x30', 'P', 30), ('26x99', 'Z', 99))
+SEEDS_BENCHMARK = range(1, 21)
+
+
+# Função Auxiliar
+def mede(funcao, argumentos, repeticoes, preparacao=None):
+    '''
+    mede: funcao x tuplo x int x funcao -> float
+    Devolve o melhor tempo, em segundos, de repeticoes chamadas funcao(*argumentos). Se preparacao nao for None,
+    os argumentos de cada repeticao sao obtidos chamando preparacao(), fora do tempo medido.
+    '''
+    melhor = None
+    for _ in range(repeticoes):
+        if preparacao is not None:
+            argumentos = preparacao()
+        inicio = time.perf_counter()
+        funcao(*argumentos)
+        tempo = time.perf_counter() - inicio
+        if melhor is None or tempo < melhor:
+            melhor = tempo
+    return melhor
+
+
+# Função Auxiliar
+def campo_meio_jogo(c, l, n, s):
+    '''
+    campo_meio_jogo: str x int x int x int -> campo
+    Devolve um campo com n minas colocadas a partir da coordenada central com a seed s, limpa essa coordenada e
+    limpa metade das restantes parcelas sem mina e marca metade das minas, para medir a visualizacao.
+    '''
+    m = cria_campo(c, l)
+    centro = cria_coordenada(chr((ord(c) + ord('A')) // 2), (l + 1) // 2)
+    coloca_minas(m, centro, cria_gerador(32, s), n)
+    limpa_campo(m, centro)
+    for i in range(0, len(m['estados']), 2):
+        if m['minas'][i]:
+            altera_estado_celula(m, i, MARCADA)
+        else:
+            limpa_celulas(m, i)
+    return m
+
+
+# Função Auxiliar
+def jogadas_seguras(c, l, n, s):
+    '''
+    jogadas_seguras: str x int x int x int -> lista
+    Devolve as jogadas de uma partida ganha com os argumentos de minas c, l, n, 32 e s: limpa a coordenada central
+    e depois percorre as parcelas da esquerda para a direita e de cima para baixo, marcando as que escondem minas e
+    limpando as restantes, conhecendo a disposicao que joga_partida vai colocar a partir do centro.
+    '''
+    m = cria_campo(c, l)
+    centro = cria_coordenada(chr((ord(c) + ord('A')) // 2), (l + 1) // 2)
+    coloca_minas(m, centro, cria_gerador(32, s), n)
+    jogadas = [('L', centro)]
+    for i, mina in enumerate(m['minas']):
+        jogadas.append(('M' if mina else 'L', obtem_coordenada_indice(m, i)))
+    return jogadas
+
+
+# Função Auxiliar
+def joga_partidas_fixas(c, l, n, partidas):
+    '''
+    joga_partidas_fixas: str x int x int x lista -> int
+    Joga no proprio processo, sem cache, uma partida por cada seed de SEEDS_BENCHMARK com as jogadas da posicao
+    correspondente de partidas (ver jogadas_seguras), e devolve o numero de vitorias.
+    '''
+    cache = cria_cache_campos(0)
+    return sum(1 for s, jogadas in zip(SEEDS_BENCHMARK, partidas)
+               if joga_partida(c, l, n, 32, s, jogadas, cache)['ganho'])
+
+
+def executa_benchmarks(ficheiro_resultados=None, ficheiro_referencia=None, tolerancia=0.5, repeticoes=15):
+    '''
+    executa_benchmarks: str x str x float x int -> dicionario
+    Mede, para cada campo de CAMPOS_BENCHMARK, a criacao e copia do campo, a colocacao de minas com densidade
+    baixa, media e perto do maximo, a limpeza em cascata a partir da pior abertura (uma so mina no canto oposto),
+    a visualizacao de um campo a meio do jogo e partidas completas (todas ganhas, com as jogadas de jogadas_seguras)
+    sem consola com seeds fixas. Mede ainda a
+    abertura (avalia_abertura), o resolvedor (avalia_resolvedor, como segundos por parcela resolvida, com as seeds
+    de SEEDS_BENCHMARK) e a procura numa reproducao (avalia_procura, como segundos por procura). Devolve um
+    dicionario com 'resultados' (nome -> melhor tempo em segundos) e 'regressoes', a lista dos nomes cujo tempo
+    excede em mais de tolerancia (fracao) o tempo guardado em ficheiro_referencia, se este for dado.
+    Se ficheiro_resultados for dado, grava nele os resultados em JSON, no formato lido como referencia.
+    '''
+    resultados = {}
+    for nome, c, l in CAMPOS_BENCHMARK:
+        n_celulas = (ord(c) - ord('A') + 1) * l
+        centro = cria_coordenada(chr((ord(c) + ord('A')) // 2), (l + 1) // 2)
+        m = cria_campo(c, l)
+
+        resultados['cria_campo/' + nome] = mede(cria_campo, (c, l), repeticoes)
+        resultados['cria_copia_campo/' + nome] = mede(cria_copia_campo, (m,), repeticoes)
+        for densidade, n in (('baixa', n_celulas // 10), ('media', n_celulas // 5), ('maxima', n_celulas - 9)):
+            resultados['coloca_minas/' + densidade + '/' + nome] = mede(
+                coloca_minas, (), repeticoes,
+                lambda: (cria_campo(c, l), centro, cria_gerador(32, 1), n))
+
+        def pior_abertura():
+            aberto = cria_campo(c, l)
+            esconde_mina_celula(aberto, n_celulas - 1)
+            return aberto, cria_coordenada('A', 1)
+        resultados['limpa_campo/' + nome] = mede(limpa_campo, (), repeticoes, pior_abertura)
+
+        meio = campo_meio_jogo(c, l, n_celulas // 5, 1)
+        resultados['campo_para_str/' + nome] = mede(campo_para_str, (meio,), repeticoes)
+        partidas = [jogadas_seguras(c, l, n_celulas // 8, s) for s in SEEDS_BENCHMARK]
+        resultados['partidas/' + nome] = mede(joga_partidas_fixas, (c, l, n_celulas // 8, partidas), repeticoes)
+
+    # As avaliacoes de debito sao convertidas em tempos, para que um valor maior seja sempre pior
+    resultados['abertura/26x99'] = avalia_abertura(repeticoes=repeticoes)
+    resultados['resolvedor/26x16'] = min(1 / avalia_resolvedor(seeds=SEEDS_BENCHMARK) for _ in range(repeticoes))
+    resultados['procura/26x99'] = min(avalia_procura()[1] for _ in range(repeticoes))
+
+    regressoes = []
+    if ficheiro_referencia is not None:
+        with open(ficheiro_referencia) as ficheiro:
+            referencia = json.load(ficheiro)['resultados']
+        for nome, tempo in resultados.items():
+            if nome in referencia and tempo > referencia[nome] * (1 + tolerancia):
+                regressoes.append(nome)
+
+    if ficheiro_resultados is not None:
+        with open(ficheiro_resultados, 'w') as ficheiro:
+            json.dump({'versao': 1, 'resultados': resultados}, ficheiro, indent=2, sort_keys=True)
+    return {'resultados': resultados, 'regressoes': regressoes}
+
+
+# -##################################################################################################################-#
+#                                                       EXECUCAO                                                      #
+# -##################################################################################################################-#
+
+
+def principal(argumentos=None):
+    '''
+    principal: lista -> booleano
+    Joga minas com os argumentos da linha de comandos (por omissao, sys.argv[1:]): a ultima coluna, a ultima linha,
+    o numero de minas, os bits do gerador e a seed, com a opcao --terminal para o modo terminal ou --lote FICHEIRO
+    ('-' para a entrada padrao) para o modo sem perguntas de minas_lote, com lotes de --tamanho-lote jogadas.
+    Com a opcao --benchmarks, sem os argumentos do jogo, corre executa_benchmarks (comparando com --referencia e
+    gravando em --resultados, se dados), escreve os tempos e as regressoes, e termina com o codigo de saida 1 caso
+    haja alguma regressao.
+    '''
+    parser = argparse.ArgumentParser(description='Jogo das minas.')
+    parser.add_argument('coluna', nargs='?')
+    parser.add_argument('linha', type=int, nargs='?')
+    parser.add_argument('minas', type=int, nargs='?')
+    parser.add_argument('bits', type=int, nargs='?')
+    parser.add_argument('seed', type=int, nargs='?')
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument('--terminal', action='store_true', help='redesenha so as parcelas alteradas (ANSI)')
+    modo.add_argument('--lote', metavar='FICHEIRO', help="le as jogadas de FICHEIRO ('-' para stdin)")
+    modo.add_argument('--benchmarks', action='store_true', help='corre a suite de desempenho')
+    parser.add_argument('--tamanho-lote', type=int, default=64)
+    parser.add_argument('--referencia', metavar='FICHEIRO', help='resultados de referencia (JSON) para --benchmarks')
+    parser.add_argument('--resultados', metavar='FICHEIRO', help='grava os resultados de --benchmarks (JSON)')
+    parser.add_argument('--tolerancia', type=float, default=0.5)
+    parser.add_argument('--repeticoes', type=int, default=15)
+    args = parser.parse_args(argumentos)
+    argumentos_jogo = (args.coluna, args.linha, args.minas, args.bits, args.seed)
+    if args.benchmarks:
+        if any(argumento is not None for argumento in argumentos_jogo):
+            parser.error('--benchmarks nao recebe os argumentos do jogo')
+        suite = executa_benchmarks(args.resultados, args.referencia, args.tolerancia, args.repeticoes)
+        for nome, tempo in sorted(suite['resultados'].items()):
+            print('{:<32} {:.6f}'.format(nome, tempo))
+        for nome in suite['regressoes']:
+            print('REGRESSAO', nome)
+        if suite['regressoes']:
+            sys.exit(1)
+        return True
+    if any(argumento is None for argumento in argumentos_jogo):
+        parser.error('sao precisos os argumentos coluna linha minas bits seed')
+    jogo = (args.coluna, args.linha, args.minas, args.bits, args.seed)
+    if args.lote is None:
+        return minas(*jogo, terminal=args.terminal)
+    if args.lote == '-':
+        return minas_lote(*jogo, tamanho_lote=args.tamanho_lote)
+    with open(args.lote) as entrada:
+        return minas_lote(*jogo, entrada=entrada, tamanho_lote=args.tamanho_lote)
+
+
+if __name__ == '__main__':
+    principal()
@@ -0,0 +1,281 @@
+from array import array
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import Minesweeper
+from Minesweeper import SEEDS_BENCHMARK, abre_arquivo_jogos, alterna_bandeira_extensa, aplica_jogada, \
+    atualiza_estado, avanca_estado, campo_extenso_para_str, carrega_jogo, coloca_minas, continua_limpeza_extensa, \
+    cria_campo, cria_campo_extenso, cria_coordenada, cria_copia_gerador, cria_diario, cria_gerador, desfaz_jogada, \
+    divide_gerador, eh_mina_extensa, fecha_arquivo_jogos, gera_estados, gera_numero_aleatorio, guarda_jogos, \
+    joga_diario, joga_partidas_fixas, jogadas_seguras, limpa_campo, limpa_campo_extenso, obtem_coordenada_indice, \
+    obtem_estado, obtem_estado_extenso, obtem_memoria_diario, obtem_numero_parcelas, obtem_pontos_diario, \
+    obtem_posicao_diario, principal, refaz_jogada, restaura_ponto_diario
+
+
+class TestAvancaEstado(unittest.TestCase):
+
+    def passo_a_passo(self, g, n):
+        for _ in range(n):
+            atualiza_estado(g)
+        return g[1]
+
+    def test_igual_a_passos_32_bits(self):
+        for s in (1, 5, 123456789, 2 ** 32 - 1):
+            for n in (0, 1, 2, 7, 64, 1000, 4097):
+                self.assertEqual(avanca_estado(cria_gerador(32, s), n), self.passo_a_passo(cria_gerador(32, s), n))
+
+    def test_igual_a_passos_64_bits(self):
+        for s in (1, 5, 123456789, 2 ** 64 - 1):
+            for n in (0, 1, 2, 7, 64, 1000, 4097):
+                self.assertEqual(avanca_estado(cria_gerador(64, s), n), self.passo_a_passo(cria_gerador(64, s), n))
+
+    def test_seed_no_limite(self):
+        for b in (32, 64):
+            g = cria_gerador(b, 2 ** b)
+            self.assertEqual(avanca_estado(g, 100), self.passo_a_passo(cria_gerador(b, 2 ** b), 100))
+            self.assertEqual(g[1], self.passo_a_passo(cria_gerador(b, 2 ** b), 100))
+
+    def test_saltos_compostos(self):
+        for b in (32, 64):
+            g = cria_gerador(b, 42)
+            avanca_estado(g, 2 ** 40)
+            avanca_estado(g, 12345)
+            self.assertEqual(g[1], avanca_estado(cria_gerador(b, 42), 2 ** 40 + 12345))
+
+    def test_argumentos_invalidos(self):
+        for n in (-1, -2 ** 40, 1.5):
+            g = cria_gerador(32, 5)
+            with self.assertRaisesRegex(ValueError, 'avanca_estado: argumentos invalidos'):
+                avanca_estado(g, n)
+            self.assertEqual(g, [32, 5])
+
+
+class TestGeraEstados(unittest.TestCase):
+
+    def passo_a_passo(self, b, s, k):
+        g = cria_gerador(b, s)
+        return [atualiza_estado(g) for _ in range(k)], obtem_estado(g)
+
+    def verifica(self, tipo):
+        for b, s in ((32, 1), (32, 2 ** 32 - 1), (64, 5), (64, 2 ** 64 - 1)):
+            g = cria_gerador(b, s)
+            estados = gera_estados(g, 100)
+            self.assertIsInstance(estados, tipo)
+            self.assertEqual(([int(e) for e in estados], obtem_estado(g)), self.passo_a_passo(b, s, 100))
+
+    @unittest.skipIf(Minesweeper.np is None, 'NumPy nao instalado')
+    def test_numpy(self):
+        self.verifica(Minesweeper.np.ndarray)
+
+    def test_sem_numpy(self):
+        with mock.patch.object(Minesweeper, 'np', None):
+            self.verifica(array)
+
+    def test_semente_limite(self):
+        for b in (32, 64):
+            g = cria_gerador(b, 2 ** b)
+            estados = gera_estados(g, 50)
+            self.assertIsInstance(estados, list)
+            self.assertEqual((estados, obtem_estado(g)), self.passo_a_passo(b, 2 ** b, 50))
+
+
+class TestDivideGerador(unittest.TestCase):
+
+    def test_subsequencias(self):
+        for b in (32, 64):
+            g = cria_gerador(b, 99)
+            geradores = divide_gerador(g, 4)
+            self.assertEqual(g, [b, 99])
+            self.assertEqual(len(geradores), 4)
+            self.assertEqual(geradores[0], g)
+            passo = (2 ** b - 1) // 4
+            for i, gi in enumerate(geradores):
+                self.assertEqual(gi[1], avanca_estado(cria_copia_gerador(g), i * passo))
+            self.assertEqual(len({gi[1] for gi in geradores}), 4)
+
+    def test_um_gerador(self):
+        self.assertEqual(divide_gerador(cria_gerador(32, 7), 1), [[32, 7]])
+
+    def test_argumentos_invalidos(self):
+        for k in (0, -1, 1.5):
+            with self.assertRaises(ValueError):
+                divide_gerador(cria_gerador(32, 7), k)
+
+
+class TestColocaMinasBaralhadas(unittest.TestCase):
+
+    def test_enche_celulas_elegiveis(self):
+        m = coloca_minas(cria_campo('E', 5), cria_coordenada('C', 3), cria_gerador(32, 1), 16, False)
+        self.assertEqual(sum(m['minas']), 16)
+
+    def test_minas_a_mais(self):
+        with self.assertRaisesRegex(ValueError, 'coloca_minas_baralhadas: argumentos invalidos'):
+            coloca_minas(cria_campo('E', 5), cria_coordenada('C', 3), cria_gerador(32, 1), 17, False)
+
+
+class TestCampoExtenso(unittest.TestCase):
+
+    def test_limite_obrigatorio_sem_dimensao(self):
+        for colunas, linhas in ((None, None), (10, None), (None, 10)):
+            m = cria_campo_extenso(0.05, 32, 1, colunas, linhas)
+            with self.assertRaises(ValueError):
+                limpa_campo_extenso(m, ('A', 1))
+            with self.assertRaises(ValueError):
+                continua_limpeza_extensa(m)
+            self.assertTrue(limpa_campo_extenso(m, ('A', 1), limite=100))
+
+    def test_coordenada_fora_do_campo(self):
+        m = cria_campo_extenso(0.1, 32, 3, 5, 5)
+        for funcao in (obtem_estado_extenso, eh_mina_extensa, alterna_bandeira_extensa, limpa_campo_extenso):
+            for c in (('F', 1), ('A', 6)):
+                with self.assertRaisesRegex(ValueError, funcao.__name__ + ': argumentos invalidos'):
+                    funcao(m, c)
+
+    def test_janela_invalida(self):
+        m = cria_campo_extenso(0.1, 32, 3, 5, 5)
+        for largura, altura in ((0, 3), (3, 0), (-1, 3), (3, 1.5)):
+            with self.assertRaisesRegex(ValueError, 'campo_extenso_para_str: argumentos invalidos'):
+                campo_extenso_para_str(m, ('A', 1), largura, altura)
+
+    def limpa_e_desenha(self):
+        m = cria_campo_extenso(0.1, 32, 1, 40, 40)
+        reveladas = limpa_campo_extenso(m, ('A', 1))
+        return reveladas, campo_extenso_para_str(m, ('A', 1), 40, 40)
+
+    def test_igual_com_e_sem_numpy(self):
+        # Corre com o que gera_estados devolver neste ambiente e com o array.array, que tem de dar o mesmo campo
+        reveladas, desenho = self.limpa_e_desenha()
+        self.assertTrue(reveladas)
+        with mock.patch.object(Minesweeper, 'np', None):
+            self.assertEqual(self.limpa_e_desenha(), (reveladas, desenho))
+
+
+class TestJogaPartidasFixas(unittest.TestCase):
+
+    def test_partidas_completas(self):
+        for c, l, n in (('H', 8, 8), ('P', 16, 32)):
+            partidas = [jogadas_seguras(c, l, n, s) for s in SEEDS_BENCHMARK]
+            self.assertEqual(joga_partidas_fixas(c, l, n, partidas), len(SEEDS_BENCHMARK))
+
+
+def retrato(m):
+    return bytes(m['estados']), tuple(obtem_numero_parcelas(m, s) for s in ('marcadas', 'limpas', 'por_limpar'))
+
+
+def campo_com_minas(s):
+    m = cria_campo('P', 16)
+    return coloca_minas(m, cria_coordenada('H', 8), cria_gerador(32, s), 40)
+
+
+class TestDiario(unittest.TestCase):
+
+    def joga_aleatorio(self, d, s, n_jogadas):
+        # Devolve o retrato do campo em cada posicao do diario, a comecar pela posicao atual
+        m, g = d['campo'], cria_gerador(32, s)
+        retratos = {obtem_posicao_diario(d): retrato(m)}
+        joga_diario(d, 'L', cria_coordenada('H', 8))
+        retratos[obtem_posicao_diario(d)] = retrato(m)
+        while len(retratos) <= n_jogadas:
+            acao = 'LMA'[gera_numero_aleatorio(g, 3) - 1]
+            c = obtem_coordenada_indice(m, gera_numero_aleatorio(g, len(m['estados'])) - 1)
+            if joga_diario(d, acao, c) is not None:
+                retratos[obtem_posicao_diario(d)] = retrato(m)
+        return retratos
+
+    def test_desfaz_e_refaz(self):
+        for s in (1, 2, 3):
+            d = cria_diario(campo_com_minas(s), 1 << 20)
+            retratos = self.joga_aleatorio(d, s, 60)
+            fim = obtem_posicao_diario(d)
+            while desfaz_jogada(d):
+                self.assertEqual(retrato(d['campo']), retratos[obtem_posicao_diario(d)])
+            self.assertEqual(obtem_posicao_diario(d), 0)
+            while refaz_jogada(d):
+                self.assertEqual(retrato(d['campo']), retratos[obtem_posicao_diario(d)])
+            self.assertEqual(obtem_posicao_diario(d), fim)
+
+            # Uma jogada nova depois de desfazer descarta as jogadas desfeitas
+            desfaz_jogada(d)
+            alvo = bytes(d['campo']['estados']).find(b'#')
+            self.assertTrue(joga_diario(d, 'M', obtem_coordenada_indice(d['campo'], alvo)))
+            self.assertFalse(refaz_jogada(d))
+
+    def test_pontos_depois_de_compactar(self):
+        orcamento = 600
+        d = cria_diario(campo_com_minas(4), orcamento)
+        retratos = self.joga_aleatorio(d, 4, 120)
+        self.assertLessEqual(obtem_memoria_diario(d), orcamento)
+        pontos = obtem_pontos_diario(d)
+        self.assertTrue(pontos)
+
+        # As entradas que restam desfazem-se ate ao ponto mais recente
+        while desfaz_jogada(d):
+            self.assertEqual(retrato(d['campo']), retratos[obtem_posicao_diario(d)])
+        self.assertEqual(obtem_posicao_diario(d), pontos[-1])
+
+        for posicao in reversed(pontos):
+            restaura_ponto_diario(d, posicao)
+            self.assertEqual(obtem_posicao_diario(d), posicao)
+            self.assertEqual(retrato(d['campo']), retratos[posicao])
+
+
+class TestArquivoJogos(unittest.TestCase):
+
+    def test_guarda_e_carrega(self):
+        jogos = []
+        for s, b in ((1, 32), (2 ** 32, 32), (2 ** 64, 64), (987654321, 64)):
+            m = campo_com_minas(s % 1000 + 1)
+            limpa_campo(m, cria_coordenada('H', 8))
+            for i in range(0, len(m['estados']), 7):
+                if m['estados'][i] == ord('#'):
+                    aplica_jogada(m, 'M', obtem_coordenada_indice(m, i))
+            jogos.append((m, cria_gerador(b, s)))
+
+        with tempfile.TemporaryDirectory() as diretoria:
+            caminho = os.path.join(diretoria, 'jogos.bin')
+            self.assertEqual(guarda_jogos(caminho, jogos), len(jogos))
+            arquivo = abre_arquivo_jogos(caminho)
+            try:
+                for k in reversed(range(len(jogos))):
+                    m, g = carrega_jogo(arquivo, k)
+                    original, g_original = jogos[k]
+                    self.assertEqual((m['colunas'], m['linhas']), (original['colunas'], original['linhas']))
+                    self.assertEqual(retrato(m), retrato(original))
+                    self.assertEqual(m['minas'], original['minas'])
+                    self.assertEqual(m['vizinhas'], original['vizinhas'])
+                    self.assertEqual(g, g_original)
+            finally:
+                fecha_arquivo_jogos(arquivo)
+
+
+class TestPrincipalBenchmarks(unittest.TestCase):
+
+    def corre(self, *argumentos):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return principal(['--benchmarks', '--repeticoes', '1'] + list(argumentos))
+
+    def test_regressao_termina_com_erro(self):
+        with tempfile.TemporaryDirectory() as diretoria:
+            resultados = os.path.join(diretoria, 'resultados.json')
+            self.assertTrue(self.corre('--resultados', resultados))
+            with open(resultados) as ficheiro:
+                dados = json.load(ficheiro)
+            for nome in ('abertura/26x99', 'resolvedor/26x16', 'procura/26x99'):
+                self.assertIn(nome, dados['resultados'])
+
+            dados['resultados'] = {nome: tempo / 1000 for nome, tempo in dados['resultados'].items()}
+            referencia = os.path.join(diretoria, 'referencia.json')
+            with open(referencia, 'w') as ficheiro:
+                json.dump(dados, ficheiro)
+            with self.assertRaises(SystemExit) as saida:
+                self.corre('--referencia', referencia)
+            self.assertEqual(saida.exception.code, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()